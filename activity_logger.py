@@ -0,0 +1,82 @@
+import atexit
+import logging
+import threading
+from collections import deque
+from postgrest.types import ReturnMethod
+from database import create_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Flush whenever this many events are waiting, or after FLUSH_INTERVAL seconds
+FLUSH_BATCH_SIZE = 20
+FLUSH_INTERVAL = 0.5
+
+# Largest insert sent in one request, to stay well under PostgREST body limits
+MAX_INSERT_ROWS = 500
+
+class ActivityBuffer:
+    """
+    Process-wide buffer for rows of one append-only table (user_activity by
+    default). Events are collected in memory and written by a daemon thread as
+    one batched insert per flush.
+    """
+
+    def __init__(self, table="user_activity", batch_size=FLUSH_BATCH_SIZE, interval=FLUSH_INTERVAL):
+        self.table = table
+        self.batch_size = batch_size
+        self.interval = interval
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._client = None
+        self._thread = None
+        self._flush_callbacks = []
+
+    def append(self, row):
+        """Queue one row, waking the writer once a full batch is waiting"""
+        with self._lock:
+            self._events.append(row)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            full = len(self._events) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def on_flush(self, callback):
+        """Call callback after each successful write (e.g. to clear cached counts)"""
+        self._flush_callbacks.append(callback)
+
+    def flush(self):
+        """Drain the buffer, inserting up to MAX_INSERT_ROWS rows per request"""
+        with self._lock:
+            batch = list(self._events)
+            self._events.clear()
+        if not batch:
+            return
+        written = False
+        for start in range(0, len(batch), MAX_INSERT_ROWS):
+            rows = batch[start:start + MAX_INSERT_ROWS]
+            try:
+                if self._client is None:
+                    self._client = create_supabase_client()
+                self._client.table(self.table).insert(rows, returning=ReturnMethod.minimal).execute()
+                written = True
+            except Exception as e:
+                logger.error("Failed to write %d %s rows: %s", len(rows), self.table, e)
+        if written:
+            for callback in self._flush_callbacks:
+                callback()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+activity_buffer = ActivityBuffer()
+search_log_buffer = ActivityBuffer("search_logs")
+
+# Write whatever is still queued when the server shuts down
+atexit.register(activity_buffer.flush)
+atexit.register(search_log_buffer.flush)
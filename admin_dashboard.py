@@ -1,16 +1,25 @@
 import streamlit as st
 import pandas as pd
-from supabase import create_client, Client
-import os
-from datetime import datetime, timedelta
+from supabase import Client
+import io
+import math
+from datetime import datetime, timedelta, timezone
 import plotly.express as px
-import plotly.graph_objects as go
-from collections import defaultdict
+from postgrest.exceptions import APIError
+from database import get_supabase, execute_with_retry, run_concurrently
+from realtime_feed import RealtimeFeed
+from auth import get_user_tier
 
-# Initialize Supabase client
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_ANON_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+USERS_PAGE_SIZE = 50
+
+# PostgREST error code for a .range() offset past the last matching row
+RANGE_NOT_SATISFIABLE = "PGRST103"
+REPORT_CHUNK_SIZE = 1000
+SUBSCRIPTION_PRICING = {"basic": 29.99, "premium": 99.99, "enterprise": 299.99}
+STATIC_CHART_CONFIG = {"staticPlot": True, "displayModeBar": False}
+
+# Initialize Supabase client (shared by all helpers, pooled connections)
+supabase: Client = get_supabase()
 
 def admin_dashboard():
     """Admin dashboard for platform management"""
@@ -47,22 +56,25 @@ def show_admin_overview():
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
     
-    # Get metrics
-    users = supabase.table("users").select("*").execute()
-    total_users = len(users.data) if users.data else 0
-    
-    thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-    active_users = supabase.table("users").select("*").gte("last_login", thirty_days_ago).execute()
-    active_count = len(active_users.data) if active_users.data else 0
+    # Timestamps are computed once per render and passed to the helpers
+    now = datetime.now(timezone.utc)
+    seven_days_ago = (now - timedelta(days=7)).date().isoformat()
     
-    today = datetime.now().date().isoformat()
-    today_activities = supabase.table("user_activity").select("*").gte("created_at", today).execute()
-    today_activity_count = len(today_activities.data) if today_activities.data else 0
-    
-    revenue = calculate_monthly_revenue()
+    # Get metrics and chart data concurrently (rendering stays on the script thread)
+    metrics, activities, registrations, tiers = run_concurrently(
+        fetch_overview_metrics,
+        lambda: fetch_activity_chart_data(seven_days_ago),
+        fetch_registration_data,
+        fetch_subscription_tiers
+    )
+    total_users = metrics.get("total_users", 0)
+    active_count = metrics.get("active_30d", 0)
+    today_activity_count = metrics.get("today_activities", 0)
+    new_users_today = metrics.get("new_today", 0)
+    revenue = float(metrics.get("monthly_revenue") or 0)
     
     with col1:
-        st.metric("👥 Total Users", total_users, delta=f"+{get_new_users_today()}")
+        st.metric("👥 Total Users", total_users, delta=f"+{new_users_today}")
     with col2:
         st.metric("🟢 Active Users (30d)", active_count, delta=f"{(active_count/total_users*100):.1f}%" if total_users > 0 else "0%")
     with col3:
@@ -75,19 +87,25 @@ def show_admin_overview():
     
     with col1:
         st.subheader("Activity Trends (Last 7 Days)")
-        show_activity_chart()
+        show_activity_chart(activities)
     
     with col2:
         st.subheader("User Registration Trend")
-        show_registration_trend()
+        show_registration_trend(registrations)
     
     # Subscription distribution
     st.subheader("Subscription Distribution")
-    show_subscription_pie_chart()
+    show_subscription_pie_chart(tiers)
     
-    # Recent user activities
+    # Recent user activities (pushed over Realtime; REST on cold start or while the feed is down)
     st.subheader("Recent Platform Activities")
-    show_recent_activities()
+    feed = get_activity_feed()
+    if feed.alive:
+        if not feed.seeded:
+            feed.seed(fetch_recent_activities())
+        show_recent_activities(feed.snapshot())
+    else:
+        show_recent_activities(fetch_recent_activities())
 
 def show_user_management():
     """User management interface"""
@@ -102,41 +120,23 @@ def show_user_management():
     with col3:
         filter_status = st.selectbox("Filter by status", ["All", "active", "inactive", "suspended"])
     
-    # Get users with filters
-    users_query = supabase.table("users").select("*")
-    
-    if search_term:
-        # Note: This is a simplified search - in production, use proper text search
-        users = supabase.table("users").select("*").execute()
-        if users.data:
-            filtered_users = [
-                u for u in users.data 
-                if search_term.lower() in u.get('username', '').lower() or 
-                   search_term.lower() in u.get('email', '').lower()
-            ]
-        else:
-            filtered_users = []
-    else:
-        users = users_query.execute()
-        filtered_users = users.data if users.data else []
-    
-    # Apply additional filters
-    if filter_tier != "All":
-        filtered_users = [u for u in filtered_users if u.get('subscription_tier') == filter_tier]
-    if filter_status != "All":
-        filtered_users = [u for u in filtered_users if u.get('subscription_status') == filter_status]
+    # Get the requested page of users (filtered server-side). The widget is keyed on
+    # the filters, so changing them starts again from page 1
+    page = st.number_input("Page", min_value=1, value=1, step=1, key=f"users_page_{search_term}_{filter_tier}_{filter_status}")
+    filtered_users, total_count, page = fetch_users_page(search_term, filter_tier, filter_status, page)
+    st.caption(f"Page {page} of {max(1, math.ceil(total_count / USERS_PAGE_SIZE))} ({total_count} users)")
     
     if filtered_users:
-        # Convert to DataFrame
+        # Build the display table and selection labels in one DataFrame pass
         df = pd.DataFrame(filtered_users)
-        df['created_at'] = pd.to_datetime(df['created_at']).dt.strftime('%Y-%m-%d')
-        df['last_login'] = pd.to_datetime(df['last_login']).dt.strftime('%Y-%m-%d %H:%M')
+        table = df[['username', 'email', 'subscription_tier', 'subscription_status', 'created_at', 'last_login', 'is_admin']].assign(
+            created_at=pd.to_datetime(df['created_at'], format='ISO8601', utc=True).dt.strftime('%Y-%m-%d'),
+            last_login=pd.to_datetime(df['last_login'], format='ISO8601', utc=True).dt.strftime('%Y-%m-%d %H:%M')
+        )
+        labels = (df['username'] + " (" + df['email'] + ")").tolist()
         
         # Display users table
-        st.dataframe(
-            df[['username', 'email', 'subscription_tier', 'subscription_status', 'created_at', 'last_login', 'is_admin']],
-            use_container_width=True
-        )
+        st.dataframe(table, use_container_width=True)
         
         # User management actions
         st.subheader("User Actions")
@@ -145,7 +145,7 @@ def show_user_management():
             selected_user_index = st.selectbox(
                 "Select user for actions", 
                 range(len(filtered_users)),
-                format_func=lambda i: f"{filtered_users[i]['username']} ({filtered_users[i]['email']})"
+                format_func=labels.__getitem__
             )
             
             selected_user = filtered_users[selected_user_index]
@@ -156,26 +156,26 @@ def show_user_management():
                 if st.button("🚫 Suspend User"):
                     update_user_status(selected_user['id'], 'suspended')
                     st.success("User suspended")
-                    st.experimental_rerun()
+                    st.rerun()
             
             with col2:
                 if st.button("✅ Activate User"):
                     update_user_status(selected_user['id'], 'active')
                     st.success("User activated")
-                    st.experimental_rerun()
+                    st.rerun()
             
             with col3:
                 new_tier = st.selectbox("Change subscription", ["basic", "premium", "enterprise"])
                 if st.button("💳 Update Subscription"):
                     update_user_subscription(selected_user['id'], new_tier)
                     st.success(f"Subscription updated to {new_tier}")
-                    st.experimental_rerun()
+                    st.rerun()
             
             with col4:
                 if st.button("👑 Toggle Admin"):
                     toggle_admin_status(selected_user['id'], not selected_user['is_admin'])
                     st.success("Admin status toggled")
-                    st.experimental_rerun()
+                    st.rerun()
             
             # User details
             with st.expander("User Details"):
@@ -188,48 +188,44 @@ def show_analytics_dashboard():
     st.header("Analytics Dashboard")
     
     # Date range selector
+    today = datetime.now(timezone.utc).date()
     col1, col2 = st.columns(2)
     with col1:
-        start_date = st.date_input("Start Date", datetime.now() - timedelta(days=30))
+        start_date = st.date_input("Start Date", today - timedelta(days=30))
     with col2:
-        end_date = st.date_input("End Date", datetime.now())
+        end_date = st.date_input("End Date", today)
     
-    # User behavior analytics
-    activities = supabase.table("user_activity").select("*").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()).execute()
+    # User behavior analytics (aggregated in Postgres, see analytics_window())
+    analytics = fetch_analytics_window(start_date, end_date)
     
-    if activities.data:
-        df_activities = pd.DataFrame(activities.data)
+    if analytics.get("by_type"):
         
         # Activity distribution
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Activity Type Distribution")
-            activity_counts = df_activities['action_type'].value_counts()
-            fig_pie = px.pie(values=activity_counts.values, names=activity_counts.index)
+            activity_counts = pd.DataFrame(analytics["by_type"])
+            fig_pie = px.pie(activity_counts, values='count', names='action_type')
             st.plotly_chart(fig_pie, use_container_width=True)
         
         with col2:
             st.subheader("Daily Activity Trend")
-            df_activities['date'] = pd.to_datetime(df_activities['created_at']).dt.date
-            daily_activities = df_activities.groupby('date').size().reset_index(name='count')
+            daily_activities = pd.DataFrame(analytics["by_day"])
             fig_line = px.line(daily_activities, x='date', y='count')
             st.plotly_chart(fig_line, use_container_width=True)
         
         # Top users by activity
         st.subheader("Most Active Users")
-        user_activity = df_activities['user_id'].value_counts().head(10)
-        
-        user_details = []
-        for user_id, count in user_activity.items():
-            user = supabase.table("users").select("username, email, subscription_tier").eq("id", user_id).execute()
-            if user.data:
-                user_details.append({
-                    "Username": user.data[0]['username'],
-                    "Email": user.data[0]['email'],
-                    "Subscription": user.data[0]['subscription_tier'],
-                    "Activity Count": count
-                })
+        user_details = [
+            {
+                "Username": user['username'],
+                "Email": user['email'],
+                "Subscription": user['subscription_tier'],
+                "Activity Count": user['count']
+            }
+            for user in analytics["top_users"]
+        ]
         
         if user_details:
             st.dataframe(pd.DataFrame(user_details), use_container_width=True)
@@ -245,10 +241,11 @@ def show_subscription_management():
     st.header("Subscription Management")
     
     # Subscription metrics
-    users = supabase.table("users").select("subscription_tier, subscription_status").execute()
+    users = execute_with_retry(supabase.table("users").select("subscription_tier, subscription_status"))
     
     if users.data:
         df_subs = pd.DataFrame(users.data)
+        monthly_revenue = revenue_from_tiers(df_subs)
         
         col1, col2 = st.columns(2)
         
@@ -267,7 +264,6 @@ def show_subscription_management():
         
         # Revenue analysis
         st.subheader("Revenue Analysis")
-        monthly_revenue = calculate_monthly_revenue()
         projected_annual = monthly_revenue * 12
         
         col1, col2, col3 = st.columns(3)
@@ -288,11 +284,12 @@ def show_system_reports():
         ["User Activity Report", "Revenue Report", "Usage Statistics", "Subscription Report"]
     )
     
+    today = datetime.now(timezone.utc).date()
     col1, col2 = st.columns(2)
     with col1:
-        start_date = st.date_input("Report Start Date", datetime.now() - timedelta(days=30))
+        start_date = st.date_input("Report Start Date", today - timedelta(days=30))
     with col2:
-        end_date = st.date_input("Report End Date", datetime.now())
+        end_date = st.date_input("Report End Date", today)
     
     if st.button("📊 Generate Report"):
         if report_type == "User Activity Report":
@@ -309,16 +306,17 @@ def show_content_moderation():
     st.header("Content Moderation")
     
     # Recent feedback
-    feedback = supabase.table("feedback").select("*").order("created_at", desc=True).limit(20).execute()
+    feedback = fetch_recent_feedback()
     
-    if feedback.data:
+    if feedback:
         st.subheader("Recent Feedback")
         
-        for item in feedback.data:
+        for item in feedback:
             with st.expander(f"Feedback #{item['id'][:8]} - {item['created_at'][:10]}"):
                 col1, col2 = st.columns([3, 1])
                 
                 with col1:
+                    st.checkbox("Select for bulk action", key=f"select_{item['id']}")
                     st.write(f"**User ID:** {item['user_id']}")
                     st.write(f"**Category:** {item.get('category', 'general')}")
                     st.write(f"**Status:** {item.get('status', 'open')}")
@@ -328,96 +326,192 @@ def show_content_moderation():
                 
                 with col2:
                     if st.button(f"Flag", key=f"flag_{item['id']}"):
-                        update_feedback_status(item['id'], 'flagged')
+                        update_feedback_status([item['id']], 'flagged')
                         st.success("Flagged")
-                        st.experimental_rerun()
+                        st.rerun()
                     
                     if st.button(f"Resolve", key=f"resolve_{item['id']}"):
-                        update_feedback_status(item['id'], 'resolved')
+                        update_feedback_status([item['id']], 'resolved')
                         st.success("Resolved")
-                        st.experimental_rerun()
+                        st.rerun()
                     
                     admin_response = st.text_area(f"Response", key=f"response_{item['id']}")
                     if st.button(f"Reply", key=f"reply_{item['id']}"):
                         if admin_response:
-                            add_admin_response(item['id'], admin_response)
+                            add_admin_responses({item['id']: admin_response})
                             st.success("Response added")
-                            st.experimental_rerun()
+                            st.rerun()
+        
+        # Bulk triage: one request for all selected items / drafted replies
+        st.subheader("Bulk Actions")
+        st.session_state.selected_feedback = [
+            item['id'] for item in feedback if st.session_state.get(f"select_{item['id']}")
+        ]
+        pending_responses = {
+            item['id']: st.session_state[f"response_{item['id']}"]
+            for item in feedback if st.session_state.get(f"response_{item['id']}")
+        }
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button(f"🚩 Bulk Flag ({len(st.session_state.selected_feedback)})", disabled=not st.session_state.selected_feedback):
+                update_feedback_status(st.session_state.selected_feedback, 'flagged')
+                st.success("Selected feedback flagged")
+                st.rerun()
+        with col2:
+            if st.button(f"✅ Bulk Resolve ({len(st.session_state.selected_feedback)})", disabled=not st.session_state.selected_feedback):
+                update_feedback_status(st.session_state.selected_feedback, 'resolved')
+                st.success("Selected feedback resolved")
+                st.rerun()
+        with col3:
+            if st.button(f"💬 Send All Replies ({len(pending_responses)})", disabled=not pending_responses):
+                add_admin_responses(pending_responses)
+                st.success("Responses added")
+                st.rerun()
 
 # Helper functions
-def calculate_monthly_revenue():
-    """Calculate monthly revenue"""
-    users = supabase.table("users").select("subscription_tier").eq("subscription_status", "active").execute()
-    
-    pricing = {"basic": 29.99, "premium": 99.99, "enterprise": 299.99}
-    total = 0
+def revenue_from_tiers(df):
+    """Monthly revenue of the active users in an already-loaded users DataFrame"""
+    active_tiers = df.loc[df['subscription_status'] == 'active', 'subscription_tier']
+    return float(active_tiers.map(SUBSCRIPTION_PRICING).fillna(0).sum())
+
+def get_users_by_ids(user_ids, columns="id, username"):
+    """Fetch several users in a single query, keyed by id"""
+    if not user_ids:
+        return {}
+    users = execute_with_retry(supabase.table("users").select(columns).in_("id", list(user_ids)))
+    return {user['id']: user for user in users.data} if users.data else {}
+
+@st.cache_data(ttl=15, show_spinner=False)
+def fetch_users_page(search_term, filter_tier, filter_status, page):
+    """Fetch one page of users matching the filters, returning (users, total count, page shown)"""
+    try:
+        return (*_query_users_page(search_term, filter_tier, filter_status, page), page)
+    except APIError as e:
+        if e.code != RANGE_NOT_SATISFIABLE or page == 1:
+            raise
+    # The page is past the end of the results, so show the last page instead
+    _, total_count = _query_users_page(search_term, filter_tier, filter_status, 1)
+    last_page = max(1, math.ceil(total_count / USERS_PAGE_SIZE))
+    return (*_query_users_page(search_term, filter_tier, filter_status, last_page), last_page)
+
+def _query_users_page(search_term, filter_tier, filter_status, page):
+    users_query = supabase.table("users").select(
+        "id, username, email, subscription_tier, subscription_status, created_at, last_login, is_admin",
+        count="exact"
+    )
     
-    if users.data:
-        for user in users.data:
-            tier = user.get("subscription_tier", "basic")
-            total += pricing.get(tier, 0)
+    if search_term:
+        # Strip characters that would break the PostgREST or=() filter syntax
+        term = "".join(c for c in search_term if c not in ",()*")
+        users_query = users_query.or_(f"username.ilike.*{term}*,email.ilike.*{term}*")
+    if filter_tier != "All":
+        users_query = users_query.eq("subscription_tier", filter_tier)
+    if filter_status != "All":
+        users_query = users_query.eq("subscription_status", filter_status)
     
-    return total
+    # Only fetch the requested page; the exact count comes back in Content-Range
+    offset = (page - 1) * USERS_PAGE_SIZE
+    users = execute_with_retry(users_query.order("created_at", desc=True).range(offset, offset + USERS_PAGE_SIZE - 1))
+    return users.data or [], users.count or 0
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_analytics_window(start_date, end_date):
+    """Fetch activity aggregates (by type, by day, top users) for an inclusive date range"""
+    result = execute_with_retry(supabase.rpc("analytics_window", {
+        "start_at": start_date.isoformat(),
+        "end_at": (end_date + timedelta(days=1)).isoformat()
+    }))
+    return result.data or {}
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_recent_feedback():
+    """Fetch the latest feedback items for moderation"""
+    feedback = execute_with_retry(supabase.table("feedback").select("id, user_id, category, status, feedback_text, admin_response, created_at").order("created_at", desc=True).limit(20))
+    return feedback.data or []
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_overview_metrics():
+    """Fetch the overview counters (aggregated in Postgres, see admin_overview_metrics())"""
+    metrics = execute_with_retry(supabase.rpc("admin_overview_metrics"))
+    return metrics.data[0] if metrics.data else {}
 
-def get_new_users_today():
-    """Get count of new users today"""
-    today = datetime.now().date().isoformat()
-    users = supabase.table("users").select("*").gte("created_at", today).execute()
-    return len(users.data) if users.data else 0
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_activity_chart_data(seven_days_ago):
+    """Fetch daily activity counts since the given date (from the admin-only daily_activity RPC)"""
+    activities = execute_with_retry(supabase.rpc("admin_daily_activity", {"since": seven_days_ago}))
+    return activities.data or []
 
-def show_activity_chart():
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_registration_data():
+    """Fetch registrations per day for the last 30 days (from the admin-only daily_registrations RPC)"""
+    users = execute_with_retry(supabase.rpc("admin_daily_registrations", {"max_rows": 30}))
+    return list(reversed(users.data)) if users.data else []
+
+def fetch_subscription_tiers():
+    """Fetch subscription tier of every user"""
+    return execute_with_retry(supabase.table("users").select("subscription_tier")).data or []
+
+@st.cache_resource
+def get_activity_feed():
+    """Shared Realtime subscription to new user_activity rows"""
+    return RealtimeFeed("user_activity", maxlen=10)
+
+def fetch_recent_activities():
+    """Fetch the latest platform activities"""
+    activities = execute_with_retry(supabase.table("user_activity").select("id, action_type, user_id, created_at").order("created_at", desc=True).limit(10))
+    return activities.data or []
+
+def show_activity_chart(activities):
     """Show activity chart for last 7 days"""
-    seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
-    activities = supabase.table("user_activity").select("*").gte("created_at", seven_days_ago).execute()
-    
-    if activities.data:
-        df = pd.DataFrame(activities.data)
-        df['date'] = pd.to_datetime(df['created_at']).dt.date
-        daily_counts = df.groupby('date').size().reset_index(name='count')
-        
-        fig = px.line(daily_counts, x='date', y='count')
-        st.plotly_chart(fig, use_container_width=True)
+    if activities:
+        st.plotly_chart(build_activity_figure(activities), use_container_width=True, config=STATIC_CHART_CONFIG)
     else:
         st.info("No activity data available")
 
-def show_registration_trend():
+def show_registration_trend(users):
     """Show user registration trend"""
-    users = supabase.table("users").select("created_at").execute()
-    
-    if users.data:
-        df = pd.DataFrame(users.data)
-        df['date'] = pd.to_datetime(df['created_at']).dt.date
-        daily_registrations = df.groupby('date').size().reset_index(name='registrations')
-        
-        fig = px.bar(daily_registrations.tail(30), x='date', y='registrations')
-        st.plotly_chart(fig, use_container_width=True)
+    if users:
+        st.plotly_chart(build_registration_figure(users), use_container_width=True, config=STATIC_CHART_CONFIG)
     else:
         st.info("No registration data available")
 
-def show_subscription_pie_chart():
+def show_subscription_pie_chart(users):
     """Show subscription distribution pie chart"""
-    users = supabase.table("users").select("subscription_tier").execute()
-    
-    if users.data:
-        df = pd.DataFrame(users.data)
-        tier_counts = df['subscription_tier'].value_counts()
-        
-        fig = px.pie(values=tier_counts.values, names=tier_counts.index)
-        st.plotly_chart(fig, use_container_width=True)
+    if users:
+        st.plotly_chart(build_subscription_figure(users), use_container_width=True, config=STATIC_CHART_CONFIG)
+
+# Overview figures are memoized on their input rows so reruns reuse the built figure
+@st.cache_data(ttl=60, show_spinner=False)
+def build_activity_figure(activities):
+    """Build the 7-day activity line chart"""
+    df = pd.DataFrame(activities)
+    # Rows are already per (day, action, user); only sum them per day
+    daily_counts = df.groupby('date')['c'].sum().reset_index(name='count')
+    return px.line(daily_counts, x='date', y='count')
+
+@st.cache_data(ttl=60, show_spinner=False)
+def build_registration_figure(users):
+    """Build the daily registrations bar chart"""
+    return px.bar(pd.DataFrame(users), x='date', y='registrations')
+
+@st.cache_data(ttl=60, show_spinner=False)
+def build_subscription_figure(users):
+    """Build the subscription tier pie chart"""
+    tier_counts = pd.DataFrame(users)['subscription_tier'].value_counts()
+    return px.pie(values=tier_counts.values, names=tier_counts.index)
 
-def show_recent_activities():
+def show_recent_activities(activities):
     """Show recent platform activities"""
-    activities = supabase.table("user_activity").select("*").order("created_at", desc=True).limit(10).execute()
-    
-    if activities.data:
-        for activity in activities.data:
+    if activities:
+        for activity in activities:
             st.write(f"• **{activity['action_type']}** by user {activity['user_id']} at {activity['created_at'][:19]}")
     else:
         st.info("No recent activities")
 
 def show_buying_behavior_analysis(start_date, end_date):
     """Analyze user buying behavior"""
-    orders = supabase.table("orders").select("*").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()).execute()
+    orders = execute_with_retry(supabase.table("orders").select("user_id, status, total_amount").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()))
     
     if orders.data:
         df_orders = pd.DataFrame(orders.data)
@@ -431,90 +525,122 @@ def show_buying_behavior_analysis(start_date, end_date):
         user_revenue = df_orders.groupby('user_id')['total_amount'].sum().sort_values(ascending=False).head(10)
         st.write("**Top 10 Users by Revenue:**")
         
+        users_by_id = get_users_by_ids(user_revenue.index.tolist(), "id, username")
         for user_id, revenue in user_revenue.items():
-            user = supabase.table("users").select("username").eq("id", user_id).execute()
-            username = user.data[0]['username'] if user.data else f"User {user_id}"
+            username = users_by_id[user_id]['username'] if user_id in users_by_id else f"User {user_id}"
             st.write(f"• {username}: ${revenue:.2f}")
     else:
         st.info("No order data found for the selected period")
 
 # Database update functions
+def invalidate_user_caches(affects_revenue=False):
+    """Clear only the cached reads that depend on user rows"""
+    fetch_users_page.clear()
+    get_user_tier.clear()
+    if affects_revenue:
+        fetch_overview_metrics.clear()
+
 def update_user_status(user_id, status):
     """Update user subscription status"""
-    supabase.table("users").update({"subscription_status": status}).eq("id", user_id).execute()
+    execute_with_retry(supabase.table("users").update({"subscription_status": status}).eq("id", user_id))
+    invalidate_user_caches(affects_revenue=True)
 
 def update_user_subscription(user_id, tier):
     """Update user subscription tier"""
-    supabase.table("users").update({"subscription_tier": tier}).eq("id", user_id).execute()
+    execute_with_retry(supabase.table("users").update({"subscription_tier": tier}).eq("id", user_id))
+    invalidate_user_caches(affects_revenue=True)
 
 def toggle_admin_status(user_id, is_admin):
     """Toggle user admin status"""
-    supabase.table("users").update({"is_admin": is_admin}).eq("id", user_id).execute()
+    execute_with_retry(supabase.table("users").update({"is_admin": is_admin}).eq("id", user_id))
+    invalidate_user_caches()
 
-def update_feedback_status(feedback_id, status):
-    """Update feedback status"""
-    supabase.table("feedback").update({"status": status, "updated_at": datetime.now().isoformat()}).eq("id", feedback_id).execute()
+def update_feedback_status(feedback_ids, status):
+    """Update status of one or more feedback items in a single request"""
+    execute_with_retry(supabase.table("feedback").update({"status": status, "updated_at": datetime.now(timezone.utc).isoformat()}).in_("id", list(feedback_ids)))
+    fetch_recent_feedback.clear()
 
-def add_admin_response(feedback_id, response):
-    """Add admin response to feedback"""
-    supabase.table("feedback").update({
-        "admin_response": response, 
-        "status": "in_progress",
-        "updated_at": datetime.now().isoformat()
-    }).eq("id", feedback_id).execute()
+def add_admin_responses(responses):
+    """Add admin responses ({feedback_id: response}) in a single RPC"""
+    execute_with_retry(supabase.rpc("bulk_feedback_response", {
+        "ids": list(responses.keys()),
+        "responses": list(responses.values())
+    }))
+    fetch_recent_feedback.clear()
 
 # Report generation functions
+def fetch_rows_in_chunks(build_query):
+    """Fetch every row of a report query, REPORT_CHUNK_SIZE rows per request"""
+    rows = []
+    offset = 0
+    while True:
+        chunk = execute_with_retry(build_query().range(offset, offset + REPORT_CHUNK_SIZE - 1)).data or []
+        rows.extend(chunk)
+        if len(chunk) < REPORT_CHUNK_SIZE:
+            return rows
+        offset += REPORT_CHUNK_SIZE
+
+def to_csv_bytes(df):
+    """Write a DataFrame as CSV straight into a bytes buffer"""
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
 def generate_activity_report(start_date, end_date):
     """Generate user activity report"""
-    activities = supabase.table("user_activity").select("*").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()).execute()
+    activities = fetch_rows_in_chunks(
+        lambda: supabase.table("user_activity").select("id, user_id, action_type, details, created_at").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()).order("created_at")
+    )
     
-    if activities.data:
-        df = pd.DataFrame(activities.data)
+    if activities:
+        df = pd.DataFrame(activities)
         st.subheader(f"Activity Report ({start_date} to {end_date})")
         st.dataframe(df)
         
         # Download button
-        csv = df.to_csv(index=False)
         st.download_button(
             label="📥 Download CSV",
-            data=csv,
+            data=to_csv_bytes(df),
             file_name=f"activity_report_{start_date}_to_{end_date}.csv",
             mime="text/csv"
         )
 
 def generate_revenue_report(start_date, end_date):
     """Generate revenue report"""
-    orders = supabase.table("orders").select("*").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()).execute()
+    orders = fetch_rows_in_chunks(
+        lambda: supabase.table("orders").select("order_number, user_id, status, total_amount, currency, created_at").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()).order("created_at")
+    )
     
-    if orders.data:
-        df = pd.DataFrame(orders.data)
+    if orders:
+        df = pd.DataFrame(orders)
         total_revenue = df['total_amount'].sum()
         
         st.subheader(f"Revenue Report ({start_date} to {end_date})")
         st.metric("Total Revenue", f"${total_revenue:.2f}")
         st.dataframe(df)
         
-        csv = df.to_csv(index=False)
         st.download_button(
             label="📥 Download CSV",
-            data=csv,
+            data=to_csv_bytes(df),
             file_name=f"revenue_report_{start_date}_to_{end_date}.csv",
             mime="text/csv"
         )
 
 def generate_usage_report(start_date, end_date):
     """Generate usage statistics report"""
-    activities = supabase.table("user_activity").select("*").gte("created_at", start_date.isoformat()).lte("created_at", end_date.isoformat()).execute()
+    activities = execute_with_retry(supabase.rpc("admin_daily_activity", {"since": start_date.isoformat(), "until": end_date.isoformat()}))
     
     if activities.data:
         df = pd.DataFrame(activities.data)
+        total_activities = int(df['c'].sum())
+        unique_users = df['user_id'].nunique()
         
         # Usage statistics
         usage_stats = {
-            "Total Activities": len(df),
-            "Unique Users": df['user_id'].nunique(),
-            "Most Common Activity": df['action_type'].mode().iloc[0] if not df.empty else "N/A",
-            "Average Activities per User": len(df) / df['user_id'].nunique() if df['user_id'].nunique() > 0 else 0
+            "Total Activities": total_activities,
+            "Unique Users": unique_users,
+            "Most Common Activity": df.groupby('action_type')['c'].sum().idxmax() if not df.empty else "N/A",
+            "Average Activities per User": total_activities / unique_users if unique_users > 0 else 0
         }
         
         st.subheader(f"Usage Statistics ({start_date} to {end_date})")
@@ -523,10 +649,12 @@ def generate_usage_report(start_date, end_date):
 
 def generate_subscription_report():
     """Generate subscription report"""
-    users = supabase.table("users").select("*").execute()
+    users = fetch_rows_in_chunks(
+        lambda: supabase.table("users").select("username, email, subscription_tier, subscription_status, created_at, last_login").order("created_at")
+    )
     
-    if users.data:
-        df = pd.DataFrame(users.data)
+    if users:
+        df = pd.DataFrame(users)
         
         st.subheader("Subscription Report")
         
@@ -546,13 +674,12 @@ def generate_subscription_report():
                 st.write(f"• {status.title()}: {count}")
         
         # Revenue calculation
-        revenue = calculate_monthly_revenue()
+        revenue = revenue_from_tiers(df)
         st.metric("Monthly Recurring Revenue", f"${revenue:.2f}")
         
-        csv = df.to_csv(index=False)
         st.download_button(
             label="📥 Download CSV",
-            data=csv,
+            data=to_csv_bytes(df),
             file_name="subscription_report.csv",
             mime="text/csv"
         )
\ No newline at end of file
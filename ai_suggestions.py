@@ -1,16 +1,116 @@
 import streamlit as st
-import openai
 import os
-from datetime import datetime
-from auth import check_subscription_limits, log_user_activity
-from supabase import create_client, Client
-from image_gen import generate_image
-import json
+from datetime import datetime, timezone
+from auth import check_subscription_limits, get_remaining_quota, log_user_activity
+from rate_limit import openai_limiter, retry_on_rate_limit
+from database import get_supabase, run_concurrently
+from postgrest.types import ReturnMethod
+from types import MappingProxyType
+import orjson
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-# Initialize Supabase client
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_ANON_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+logger = logging.getLogger(__name__)
+
+# Background pool for inserts the UI doesn't need to wait on
+_write_pool = ThreadPoolExecutor(max_workers=4)
+
+# Industry-specific prompt contexts (module-level so reruns don't rebuild them)
+_INDUSTRY_CONTEXTS = MappingProxyType({
+    "Banking & Finance": {
+        "context": "Professional, trustworthy, sophisticated financial services environment",
+        "keywords_str": "professional, elegant, trustworthy, premium, corporate",
+        "avoid_str": "flashy, casual, cheap-looking"
+    },
+    "Formula 1 & Motorsports": {
+        "context": "High-speed, precision, technology-driven motorsports industry",
+        "keywords_str": "speed, precision, technology, performance, racing",
+        "avoid_str": "slow, outdated, low-tech"
+    },
+    "Shipping & Logistics": {
+        "context": "Global trade, efficiency, reliability, supply chain management",
+        "keywords_str": "efficient, durable, global, reliable, logistics",
+        "avoid_str": "fragile, local-only, unreliable"
+    },
+    "Healthcare": {
+        "context": "Medical, sterile, safety-focused, patient care environment",
+        "keywords_str": "medical-grade, sterile, safe, healthcare, professional",
+        "avoid_str": "non-medical, unsafe, unprofessional"
+    }
+})
+
+# Fallback context/template fields for industries without specific entries
+_DEFAULT_CONTEXT = MappingProxyType({
+    "keywords_str": "professional, quality, branded",
+    "avoid_str": "unprofessional, low-quality"
+})
+
+_DEFAULT_TEMPLATE = MappingProxyType({
+    "customization": ["Logo printing", "Color options", "Custom packaging"],
+    "suppliers": ["Professional Supply Co.", "Industry Solutions Ltd."],
+    "lead_time": "14-21 days",
+    "sustainability": "Eco-friendly materials and packaging"
+})
+
+_SUPPLIER_LOCATIONS = ("China", "USA", "Germany", "India")
+
+# Industry-specific product templates
+_PRODUCT_TEMPLATES = MappingProxyType({
+    "Banking & Finance": [
+        {
+            "name": "Premium Leather Portfolio with Logo Embossing",
+            "description": "Sophisticated leather portfolio perfect for client meetings and presentations. Features multiple card slots, document compartments, and premium gold embossing.",
+            "why_perfect": "Conveys professionalism and attention to detail that banking clients expect",
+            "price_range": [45, 85],
+            "customization": ["Logo embossing", "Color selection", "Interior layout"],
+            "suppliers": ["Premium Leather Co.", "Executive Gifts Ltd."],
+            "lead_time": "14-21 days",
+            "sustainability": "Ethically sourced leather, recyclable packaging"
+        },
+        {
+            "name": "Smart Wireless Charging Desk Pad",
+            "description": "Premium desk pad with built-in wireless charging zones and cable management. Made from sustainable materials with anti-slip base.",
+            "why_perfect": "Modern tech solution that enhances productivity in financial workspaces",
+            "price_range": [35, 65],
+            "customization": ["Logo printing", "Color options", "Size variations"],
+            "suppliers": ["TechDesk Solutions", "Modern Office Supply"],
+            "lead_time": "10-15 days",
+            "sustainability": "Made from recycled materials, energy-efficient charging"
+        }
+    ],
+    "Formula 1 & Motorsports": [
+        {
+            "name": "Carbon Fiber Business Card Holder",
+            "description": "Sleek business card holder made from authentic carbon fiber material. Lightweight yet durable with racing-inspired design elements.",
+            "why_perfect": "Reflects the high-tech, performance-oriented nature of motorsports",
+            "price_range": [25, 45],
+            "customization": ["Team colors", "Logo engraving", "Racing stripes"],
+            "suppliers": ["Carbon Craft Co.", "Racing Accessories Ltd."],
+            "lead_time": "7-14 days",
+            "sustainability": "Recyclable carbon fiber, minimal packaging"
+        },
+        {
+            "name": "Precision Titanium Multi-Tool",
+            "description": "Professional-grade multi-tool crafted from aerospace titanium. Features precision instruments perfect for technical professionals.",
+            "why_perfect": "Embodies the precision and high-performance standards of F1",
+            "price_range": [55, 95],
+            "customization": ["Laser engraving", "Tool selection", "Carrying case"],
+            "suppliers": ["Precision Tools Inc.", "Titanium Craft"],
+            "lead_time": "21-28 days",
+            "sustainability": "Durable titanium reduces replacement needs"
+        }
+    ]
+})
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _limits_cached(user_id, action):
+    """Subscription limit check, memoized briefly so repeated reruns don't re-query"""
+    return check_subscription_limits(user_id, action)
 
 def industry_ai_suggestions():
     """AI-powered product suggestions for different industries"""
@@ -18,8 +118,14 @@ def industry_ai_suggestions():
     
     user = st.session_state.user
     
+    # The limit check and recent-suggestions read are independent, so overlap them
+    allowed, recent = run_concurrently(
+        lambda: _limits_cached(user["id"], "ai_suggestion"),
+        lambda: fetch_recent_suggestions(user["id"])
+    )
+    
     # Check subscription limits
-    if not check_subscription_limits(user["id"], "ai_suggestion"):
+    if not allowed:
         st.error("🚫 You've reached your daily AI suggestion limit. Please upgrade your subscription.")
         return
     
@@ -95,53 +201,47 @@ def industry_ai_suggestions():
                 "custom_prompt": custom_prompt
             })
             
-            # Generate suggestions
+            # Generate suggestions (the AI response streams into this placeholder)
+            stream_placeholder = st.empty()
             suggestions = generate_industry_suggestions(
                 industry, use_case, budget_range, quantity, 
                 target_audience, urgency, sustainability, 
-                customization, premium_quality, custom_prompt
+                customization, premium_quality, custom_prompt,
+                stream_placeholder
             )
             
-            # Display suggestions
-            display_suggestions(suggestions, industry, use_case)
+            # Keep the results so later reruns redisplay them instead of regenerating
+            st.session_state.ai_suggestions = {
+                "suggestions": suggestions,
+                "industry": industry,
+                "use_case": use_case
+            }
             
             # Store suggestions in database
             store_suggestions(user["id"], industry, suggestions)
+    
+    # Display the latest suggestions
+    latest = st.session_state.get("ai_suggestions")
+    if latest:
+        display_suggestions(latest["suggestions"], latest["industry"], latest["use_case"])
+    
+    st.markdown("---")
+    show_recent_suggestions(recent)
 
 def generate_industry_suggestions(industry, use_case, budget_range, quantity, 
                                 target_audience, urgency, sustainability, 
-                                customization, premium_quality, custom_prompt):
-    """Generate AI-powered product suggestions"""
-    
-    # Industry-specific prompts
-    industry_contexts = {
-        "Banking & Finance": {
-            "context": "Professional, trustworthy, sophisticated financial services environment",
-            "keywords": ["professional", "elegant", "trustworthy", "premium", "corporate"],
-            "avoid": ["flashy", "casual", "cheap-looking"]
-        },
-        "Formula 1 & Motorsports": {
-            "context": "High-speed, precision, technology-driven motorsports industry",
-            "keywords": ["speed", "precision", "technology", "performance", "racing"],
-            "avoid": ["slow", "outdated", "low-tech"]
-        },
-        "Shipping & Logistics": {
-            "context": "Global trade, efficiency, reliability, supply chain management",
-            "keywords": ["efficient", "durable", "global", "reliable", "logistics"],
-            "avoid": ["fragile", "local-only", "unreliable"]
-        },
-        "Healthcare": {
-            "context": "Medical, sterile, safety-focused, patient care environment",
-            "keywords": ["medical-grade", "sterile", "safe", "healthcare", "professional"],
-            "avoid": ["non-medical", "unsafe", "unprofessional"]
-        }
-    }
+                                customization, premium_quality, custom_prompt,
+                                stream_placeholder=None):
+    """Generate AI-powered product suggestions, streaming the raw response into stream_placeholder"""
+    
+    # Mock AI response when OpenAI is not configured (no prompt needed)
+    if not os.environ.get("OPENAI_API_KEY"):
+        return generate_mock_suggestions(industry, use_case, budget_range, quantity)
     
-    context = industry_contexts.get(industry, {
+    context = _INDUSTRY_CONTEXTS.get(industry) or {
         "context": f"{industry} professional environment",
-        "keywords": ["professional", "quality", "branded"],
-        "avoid": ["unprofessional", "low-quality"]
-    })
+        **_DEFAULT_CONTEXT
+    }
     
     # Build comprehensive prompt
     prompt = f"""
@@ -170,94 +270,116 @@ def generate_industry_suggestions(industry, use_case, budget_range, quantity,
     7. Lead time estimate
     8. Sustainability features (if applicable)
     
-    Focus on products that incorporate these keywords: {', '.join(context['keywords'])}
-    Avoid products that are: {', '.join(context['avoid'])}
+    Focus on products that incorporate these keywords: {context['keywords_str']}
+    Avoid products that are: {context['avoid_str']}
+    
+    Respond with a JSON object {{"products": [...]}} containing exactly 5 products, each with the keys
+    "name", "description", "why_perfect", "price_range" ([min, max] in USD), "customization" (list),
+    "suppliers" (list), "lead_time" and "sustainability".
     """
     
-    # Mock AI response (replace with actual OpenAI API call)
-    suggestions = generate_mock_suggestions(industry, use_case, budget_range, quantity)
+    try:
+        products = fetch_ai_products(prompt, stream_placeholder)
+    except Exception as e:
+        st.warning(f"AI service unavailable, showing template suggestions: {str(e)}")
+        return generate_mock_suggestions(industry, use_case, budget_range, quantity)
     
-    return suggestions
+    return [
+        {**product, "image_prompt": f"{product['name']} for {industry} professional use, high quality product photography"}
+        for product in products[:5]
+    ]
+
+# Parsed products by prompt, shared across sessions. The prompt embeds every input,
+# so it alone is the key. This is a plain store rather than st.cache_data because
+# the response streams into a page element, which a cached function can't replay
+AI_PRODUCT_CACHE_TTL = 3600
+AI_PRODUCT_CACHE_MAX_ENTRIES = 1024
+_ai_product_cache = OrderedDict()
+_ai_product_cache_lock = threading.Lock()
+
+def fetch_ai_products(prompt, stream_placeholder=None):
+    """Products for a prompt, from the shared cache or a streamed request on a miss"""
+    with _ai_product_cache_lock:
+        entry = _ai_product_cache.get(prompt)
+    if entry and time.monotonic() - entry[0] < AI_PRODUCT_CACHE_TTL:
+        return entry[1]
+    
+    # Failures raise before anything is stored, so they aren't cached
+    products = stream_ai_products(prompt, stream_placeholder)
+    with _ai_product_cache_lock:
+        _ai_product_cache[prompt] = (time.monotonic(), products)
+        _ai_product_cache.move_to_end(prompt)
+        while len(_ai_product_cache) > AI_PRODUCT_CACHE_MAX_ENTRIES:
+            _ai_product_cache.popitem(last=False)
+    return products
+
+def stream_ai_products(prompt, stream_placeholder=None):
+    """Request products for a prompt, streaming the raw response into stream_placeholder"""
+    # All 5 suggestions come back from a single JSON-mode request, streamed so
+    # the user sees output from the first token instead of waiting on the spinner
+    stream = create_suggestion_stream(prompt)
+    buffer = ""
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            buffer += delta
+            if stream_placeholder is not None:
+                stream_placeholder.code(buffer, language="json")
+    if stream_placeholder is not None:
+        stream_placeholder.empty()
+    return orjson.loads(buffer)["products"]
+
+# Rough token estimate: ~4 characters per prompt token plus room for 5 products
+SUGGESTION_MAX_OUTPUT_TOKENS = 2000
+
+# openai and image_gen (replicate) are imported on first use to keep page startup light
+@lru_cache(maxsize=1)
+def _get_openai():
+    """Import the OpenAI SDK the first time a real completion is requested"""
+    import openai
+    return openai
+
+@retry_on_rate_limit
+def create_suggestion_stream(prompt):
+    """Start a streamed JSON-mode completion, throttled by the shared OpenAI limiter"""
+    openai_limiter.acquire(len(prompt) // 4 + SUGGESTION_MAX_OUTPUT_TOKENS)
+    return _get_openai().chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        max_tokens=SUGGESTION_MAX_OUTPUT_TOKENS,
+        stream=True
+    )
 
 def generate_mock_suggestions(industry, use_case, budget_range, quantity):
     """Generate mock suggestions (replace with actual AI API)"""
     
-    # Industry-specific product templates
-    product_templates = {
-        "Banking & Finance": [
-            {
-                "name": "Premium Leather Portfolio with Logo Embossing",
-                "description": "Sophisticated leather portfolio perfect for client meetings and presentations. Features multiple card slots, document compartments, and premium gold embossing.",
-                "why_perfect": "Conveys professionalism and attention to detail that banking clients expect",
-                "price_range": [45, 85],
-                "customization": ["Logo embossing", "Color selection", "Interior layout"],
-                "suppliers": ["Premium Leather Co.", "Executive Gifts Ltd."],
-                "lead_time": "14-21 days",
-                "sustainability": "Ethically sourced leather, recyclable packaging"
-            },
-            {
-                "name": "Smart Wireless Charging Desk Pad",
-                "description": "Premium desk pad with built-in wireless charging zones and cable management. Made from sustainable materials with anti-slip base.",
-                "why_perfect": "Modern tech solution that enhances productivity in financial workspaces",
-                "price_range": [35, 65],
-                "customization": ["Logo printing", "Color options", "Size variations"],
-                "suppliers": ["TechDesk Solutions", "Modern Office Supply"],
-                "lead_time": "10-15 days",
-                "sustainability": "Made from recycled materials, energy-efficient charging"
-            }
-        ],
-        "Formula 1 & Motorsports": [
-            {
-                "name": "Carbon Fiber Business Card Holder",
-                "description": "Sleek business card holder made from authentic carbon fiber material. Lightweight yet durable with racing-inspired design elements.",
-                "why_perfect": "Reflects the high-tech, performance-oriented nature of motorsports",
-                "price_range": [25, 45],
-                "customization": ["Team colors", "Logo engraving", "Racing stripes"],
-                "suppliers": ["Carbon Craft Co.", "Racing Accessories Ltd."],
-                "lead_time": "7-14 days",
-                "sustainability": "Recyclable carbon fiber, minimal packaging"
-            },
-            {
-                "name": "Precision Titanium Multi-Tool",
-                "description": "Professional-grade multi-tool crafted from aerospace titanium. Features precision instruments perfect for technical professionals.",
-                "why_perfect": "Embodies the precision and high-performance standards of F1",
-                "price_range": [55, 95],
-                "customization": ["Laser engraving", "Tool selection", "Carrying case"],
-                "suppliers": ["Precision Tools Inc.", "Titanium Craft"],
-                "lead_time": "21-28 days",
-                "sustainability": "Durable titanium reduces replacement needs"
-            }
-        ]
-    }
-    
     # Get templates for industry or use generic ones
-    templates = product_templates.get(industry, [
+    templates = _PRODUCT_TEMPLATES.get(industry) or [
         {
             "name": f"Custom {use_case} Solution",
             "description": f"Professional solution designed specifically for {industry} {use_case} needs.",
             "why_perfect": f"Tailored to meet the specific requirements of {industry} professionals",
             "price_range": budget_range,
-            "customization": ["Logo printing", "Color options", "Custom packaging"],
-            "suppliers": ["Professional Supply Co.", "Industry Solutions Ltd."],
-            "lead_time": "14-21 days",
-            "sustainability": "Eco-friendly materials and packaging"
+            **_DEFAULT_TEMPLATE
         }
-    ])
+    ]
     
-    # Generate 5 suggestions
+    # Generate 5 suggestions; each is built in a single dict allocation
+    # (templates are shared constants and are never mutated)
+    n = len(templates)
     suggestions = []
     for i in range(5):
-        if i < len(templates):
-            suggestion = templates[i].copy()
-        else:
-            # Generate variations
-            base = templates[i % len(templates)].copy()
-            base["name"] = f"{base['name']} - Variant {i+1}"
-            suggestion = base
+        base = templates[i % n]
+        # Generate variations once the templates run out
+        name = base["name"] if i < n else f"{base['name']} - Variant {i+1}"
         
         # Add image generation prompt
-        suggestion["image_prompt"] = f"{suggestion['name']} for {industry} professional use, high quality product photography"
-        suggestions.append(suggestion)
+        suggestions.append({
+            **base,
+            "name": name,
+            "image_prompt": f"{name} for {industry} professional use, high quality product photography"
+        })
     
     return suggestions
 
@@ -265,52 +387,99 @@ def display_suggestions(suggestions, industry, use_case):
     """Display AI-generated suggestions"""
     st.success(f"Generated {len(suggestions)} AI suggestions for {industry} - {use_case}")
     
-    for i, suggestion in enumerate(suggestions, 1):
-        with st.expander(f"💡 Suggestion {i}: {suggestion['name']}"):
-            col1, col2 = st.columns([2, 1])
+    # Generate every product image at once (requests run concurrently)
+    if st.button("🎨 Generate all images"):
+        user = st.session_state.user
+        remaining = get_remaining_quota(user["id"], "image_generation")
+        
+        if remaining != -1 and remaining < len(suggestions):
+            st.error(f"Not enough image generations left today ({remaining} remaining)")
+        else:
+            with st.spinner("Generating product images..."):
+                from image_gen import generate_images
+                image_urls = generate_images([s["image_prompt"] for s in suggestions])
+            
+            for suggestion, image_url in zip(suggestions, image_urls):
+                if image_url:
+                    st.session_state[f"generated_image_{_suggestion_id(suggestion)}"] = image_url
+                    log_user_activity(user["id"], "image_generation", {
+                        "product_name": suggestion['name'],
+                        "prompt": suggestion["image_prompt"]
+                    })
             
-            with col1:
-                st.write(f"**Description:** {suggestion['description']}")
-                st.write(f"**Why Perfect for {industry}:** {suggestion['why_perfect']}")
-                st.write(f"**Price Range:** ${suggestion['price_range'][0]} - ${suggestion['price_range'][1]}")
-                st.write(f"**Lead Time:** {suggestion['lead_time']}")
-                st.write(f"**Customization Options:** {', '.join(suggestion['customization'])}")
-                st.write(f"**Recommended Suppliers:** {', '.join(suggestion['suppliers'])}")
-                if suggestion.get('sustainability'):
-                    st.write(f"**Sustainability:** {suggestion['sustainability']}")
+            failed = image_urls.count(None)
+            if failed:
+                st.error(f"Error generating {failed} of {len(image_urls)} images, please try again")
+    
+    for i, suggestion in enumerate(suggestions, 1):
+        _render_card(i, suggestion, industry)
+
+# Each card is a fragment, so its buttons rerun only that card, not the whole page
+@st.fragment
+def _render_card(i, suggestion, industry):
+    """Render one suggestion card with its actions"""
+    with st.expander(f"💡 Suggestion {i}: {suggestion['name']}"):
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            st.write(f"**Description:** {suggestion['description']}")
+            st.write(f"**Why Perfect for {industry}:** {suggestion['why_perfect']}")
+            st.write(f"**Price Range:** ${suggestion['price_range'][0]} - ${suggestion['price_range'][1]}")
+            st.write(f"**Lead Time:** {suggestion['lead_time']}")
+            st.write(f"**Customization Options:** {', '.join(suggestion['customization'])}")
+            st.write(f"**Recommended Suppliers:** {', '.join(suggestion['suppliers'])}")
+            if suggestion.get('sustainability'):
+                st.write(f"**Sustainability:** {suggestion['sustainability']}")
+        
+        with col2:
+            # Generated images persist across reruns, so they're never paid for twice
+            image_key = f"generated_image_{_suggestion_id(suggestion)}"
+            image_slot = st.empty()
+            if st.session_state.get(image_key):
+                image_slot.image(st.session_state[image_key], caption=suggestion['name'])
             
-            with col2:
-                # Generate product image
-                if st.button(f"🎨 Generate Image", key=f"img_{i}"):
-                    with st.spinner("Generating product image..."):
-                        user = st.session_state.user
-                        
-                        # Check image generation limits
-                        if check_subscription_limits(user["id"], "image_generation"):
-                            image_url = generate_image(suggestion["image_prompt"])
-                            if image_url:
-                                st.image(image_url, caption=suggestion['name'])
-                                
-                                # Log activity
-                                log_user_activity(user["id"], "image_generation", {
-                                    "product_name": suggestion['name'],
-                                    "prompt": suggestion["image_prompt"]
-                                })
-                            else:
-                                st.error("Failed to generate image")
+            # Generate product image
+            if st.button(f"🎨 Generate Image", key=f"img_{i}"):
+                with st.spinner("Generating product image..."):
+                    user = st.session_state.user
+                    
+                    # Check image generation limits
+                    if _limits_cached(user["id"], "image_generation"):
+                        from image_gen import generate_image
+                        image_url = generate_image(suggestion["image_prompt"])
+                        if image_url:
+                            st.session_state[image_key] = image_url
+                            image_slot.image(image_url, caption=suggestion['name'])
+                            
+                            # Log activity
+                            log_user_activity(user["id"], "image_generation", {
+                                "product_name": suggestion['name'],
+                                "prompt": suggestion["image_prompt"]
+                            })
                         else:
-                            st.error("Daily image generation limit reached")
-                
-                # Action buttons
-                if st.button(f"📋 Add to Quote", key=f"quote_{i}"):
+                            st.error("Failed to generate image")
+                    else:
+                        st.error("Daily image generation limit reached")
+            
+            # Actions are ticked together and applied in a single rerun
+            with st.form(f"actions_{i}", clear_on_submit=True):
+                add_quote = st.checkbox("📋 Add to Quote", key=f"quote_{i}")
+                find_suppliers = st.checkbox("🔍 Find Suppliers", key=f"suppliers_{i}")
+                save_favorite = st.checkbox("⭐ Save Favorite", key=f"fav_{i}")
+                submitted = st.form_submit_button("Apply")
+            
+            if submitted:
+                if add_quote:
                     add_suggestion_to_quote(suggestion)
-                
-                if st.button(f"🔍 Find Suppliers", key=f"suppliers_{i}"):
+                if find_suppliers:
                     find_suppliers_for_suggestion(suggestion)
-                
-                if st.button(f"⭐ Save Favorite", key=f"fav_{i}"):
+                if save_favorite:
                     save_favorite_suggestion(suggestion)
 
+def _suggestion_id(suggestion):
+    """Short stable id for a suggestion, used to key its session state"""
+    return hashlib.md5(suggestion["name"].encode()).hexdigest()[:8]
+
 def add_suggestion_to_quote(suggestion):
     """Add AI suggestion to quote"""
     user = st.session_state.user
@@ -326,7 +495,7 @@ def add_suggestion_to_quote(suggestion):
         "customization": suggestion["customization"],
         "suppliers": suggestion["suppliers"],
         "lead_time": suggestion["lead_time"],
-        "added_at": datetime.now().isoformat()
+        "added_at": datetime.now(timezone.utc).isoformat()
     }
     
     st.session_state.quote_items.append(quote_item)
@@ -343,17 +512,17 @@ def find_suppliers_for_suggestion(suggestion):
     
     st.info(f"Searching suppliers for {suggestion['name']}...")
     
-    # Mock supplier search results
-    suppliers = [
-        {
+    # Mock supplier search results (all fields derived from one hash per supplier)
+    suppliers = []
+    for supplier in suggestion["suppliers"]:
+        h = hash(supplier)
+        suppliers.append({
             "name": supplier,
-            "rating": 4.2 + (hash(supplier) % 8) / 10,
-            "location": ["China", "USA", "Germany", "India"][hash(supplier) % 4],
-            "min_order": 50 + (hash(supplier) % 200),
-            "lead_time": f"{7 + (hash(supplier) % 21)} days"
-        }
-        for supplier in suggestion["suppliers"]
-    ]
+            "rating": 4.2 + (h % 8) / 10,
+            "location": _SUPPLIER_LOCATIONS[h % 4],
+            "min_order": 50 + (h % 200),
+            "lead_time": f"{7 + (h % 21)} days"
+        })
     
     for supplier in suppliers:
         st.write(f"**{supplier['name']}** - ⭐ {supplier['rating']}/5")
@@ -368,15 +537,15 @@ def save_favorite_suggestion(suggestion):
     """Save suggestion as favorite"""
     user = st.session_state.user
     
-    # Store in database
+    # Store in database (optimistic; the insert finishes in the background)
     try:
-        supabase.table("product_suggestions").insert({
+        _async_insert("product_suggestions", {
             "user_id": user["id"],
             "industry_segment": "favorite",
             "prompt": f"Favorite: {suggestion['name']}",
             "suggestion_data": suggestion,
-            "created_at": datetime.now().isoformat()
-        }).execute()
+            "created_at": datetime.now(timezone.utc).isoformat()
+        })
         
         log_user_activity(user["id"], "save_favorite", {
             "suggestion_name": suggestion["name"]
@@ -389,32 +558,62 @@ def save_favorite_suggestion(suggestion):
 def store_suggestions(user_id, industry, suggestions):
     """Store suggestions in database for analytics"""
     try:
-        for suggestion in suggestions:
-            supabase.table("product_suggestions").insert({
+        now_iso = datetime.now(timezone.utc).isoformat()
+        rows = [
+            {
                 "user_id": user_id,
                 "industry_segment": industry,
                 "prompt": f"{industry} suggestions",
                 "suggestion_data": suggestion,
-                "created_at": datetime.now().isoformat()
-            }).execute()
+                "created_at": now_iso
+            }
+            for suggestion in suggestions
+        ]
+        # PostgREST accepts an array, so all rows go in one request
+        _async_insert("product_suggestions", rows)
     except Exception as e:
         st.error(f"Error storing suggestions: {str(e)}")
 
+def _async_insert(table, rows):
+    """Insert rows on the background write pool, logging any failure"""
+    # Resolve the cached client here; worker threads have no script context
+    client = get_supabase()
+    future = _write_pool.submit(lambda: client.table(table).insert(rows, returning=ReturnMethod.minimal).execute())
+    future.add_done_callback(_log_write_failure)
+    return future
+
+def _log_write_failure(future):
+    """Log a background insert that raised"""
+    if future.exception():
+        logger.error("Background insert failed: %s", future.exception())
+
+def fetch_recent_suggestions(user_id):
+    """Latest suggestion headers for a user, or None if the lookup failed"""
+    try:
+        # Headers only need the name and date, which the RPC projects server-side
+        return get_supabase().rpc("recent_suggestions_lite", {"uid": user_id}).execute().data
+    except Exception as e:
+        logger.error("Error loading recent suggestions: %s", e)
+        return None
+
 # Show recent suggestions
-def show_recent_suggestions():
+def show_recent_suggestions(suggestions):
     """Show user's recent AI suggestions"""
-    user = st.session_state.user
-    
     st.subheader("📋 Recent AI Suggestions")
     
-    try:
-        suggestions = supabase.table("product_suggestions").select("*").eq("user_id", user["id"]).order("created_at", desc=True).limit(10).execute()
-        
-        if suggestions.data:
-            for suggestion in suggestions.data:
-                with st.expander(f"💡 {suggestion['suggestion_data']['name']} - {suggestion['created_at'][:10]}"):
-                    st.json(suggestion['suggestion_data'])
-        else:
-            st.info("No recent suggestions found.")
-    except Exception as e:
-        st.error(f"Error loading suggestions: {str(e)}")
\ No newline at end of file
+    if suggestions is None:
+        st.error("Error loading suggestions")
+        return
+    
+    if suggestions:
+        for suggestion in suggestions:
+            with st.expander(f"💡 {suggestion['name']} - {suggestion['d']}"):
+                # Full suggestion data is loaded on demand
+                if st.button("Load details", key=f"load_suggestion_{suggestion['id']}"):
+                    try:
+                        details = get_supabase().table("product_suggestions").select("suggestion_data").eq("id", suggestion["id"]).single().execute()
+                        st.json(details.data["suggestion_data"])
+                    except Exception as e:
+                        st.error(f"Error loading suggestion: {str(e)}")
+    else:
+        st.info("No recent suggestions found.")
@@ -1,21 +1,14 @@
 import streamlit as st
-from supabase import create_client, Client
-import os
-from datetime import datetime
-from auth import authenticate_user, create_user, initiate_password_reset, reset_password, check_subscription_limits, log_user_activity
-from admin_dashboard import admin_dashboard
-from product_sourcing import enhanced_product_sourcing
-from ai_suggestions import industry_ai_suggestions
-from custom_branding import branding_manager
-from social_trends import trend_monitor
-from order_management import order_manager
-from analytics import user_analytics
+from supabase import Client
+from database import get_supabase, run_concurrently
+from limits import get_subscription_limits
+from datetime import datetime, timezone
+from auth import authenticate_user, create_user, initiate_password_reset, reset_password, check_subscription_limits, get_daily_usage, log_user_activity
 import hashlib
+import orjson
 
-# Initialize Supabase client
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_ANON_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+# Shared Supabase client (created once per server process, not per rerun)
+supabase: Client = get_supabase()
 
 # Page setup
 st.set_page_config(
@@ -49,9 +42,32 @@ st.markdown("""
         border-radius: 8px;
         border-left: 4px solid #667eea;
     }
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 1rem;
+        margin-bottom: 1rem;
+    }
+    .metric-label {
+        font-size: 0.875rem;
+        color: #6c757d;
+    }
+    .metric-value {
+        font-size: 2rem;
+        font-weight: 600;
+    }
 </style>
 """, unsafe_allow_html=True)
 
+METRIC_CARDS_HTML = """
+<div class="metric-grid">
+    <div class="metric-card"><div class="metric-label">Searches Today</div><div class="metric-value">{searches_today}</div></div>
+    <div class="metric-card"><div class="metric-label">AI Suggestions</div><div class="metric-value">{suggestions_today}</div></div>
+    <div class="metric-card"><div class="metric-label">Total Orders</div><div class="metric-value">{orders_total}</div></div>
+    <div class="metric-card"><div class="metric-label">Account Age</div><div class="metric-value">{account_age}</div></div>
+</div>
+"""
+
 def main():
     # Check for password reset token in URL
     query_params = st.experimental_get_query_params()
@@ -86,10 +102,12 @@ def show_login_page():
                     success, user_data, message = authenticate_user(username, password)
                     if success:
                         st.session_state.authenticated = True
+                        # Parse the signup date once instead of on every dashboard render
+                        user_data["_created_at_dt"] = datetime.fromisoformat(user_data["created_at"].replace('Z', '+00:00'))
                         st.session_state.user = user_data
                         log_user_activity(user_data["id"], "login")
                         st.success("Login successful!")
-                        st.experimental_rerun()
+                        st.rerun()
                     else:
                         st.error(message)
                 else:
@@ -136,7 +154,7 @@ def show_login_page():
             if reset_email:
                 success, message = initiate_password_reset(reset_email)
                 if success:
-                    st.success("Password reset email sent! Check your inbox.")
+                    st.success(message)
                 else:
                     st.error(message)
             else:
@@ -177,45 +195,85 @@ def show_main_app():
         if st.button("Logout"):
             st.session_state.authenticated = False
             st.session_state.user = None
-            st.experimental_rerun()
+            st.rerun()
     
-    # Sidebar navigation
+    # Sidebar navigation (only the selected page's module is imported and run)
+    pages = get_pages()
     if user.get("is_admin"):
-        pages = ["Dashboard", "Product Sourcing", "AI Suggestions", "Custom Branding", "Social Trends", "Order Management", "Analytics", "Admin Panel"]
+        names = ["Dashboard", "Product Sourcing", "AI Suggestions", "Custom Branding", "Social Trends", "Order Management", "Analytics", "Admin Panel"]
     else:
-        pages = ["Dashboard", "Product Sourcing", "AI Suggestions", "Custom Branding", "Order Management", "My Analytics"]
+        names = ["Dashboard", "Product Sourcing", "AI Suggestions", "Custom Branding", "Order Management", "My Analytics"]
     
-    page = st.sidebar.selectbox("Navigation", pages)
+    page = st.navigation([pages[name] for name in names])
     
     # Subscription limits info
     with st.sidebar:
         st.markdown("---")
         st.subheader("Subscription Limits")
         limits = get_subscription_limits(user["subscription_tier"])
+        today = datetime.now().date().isoformat()
+        
+        # Usage counts are independent reads, so fetch them concurrently
+        limited = [action for action, limit in limits.items() if limit != -1]
+        try:
+            usages = dict(zip(limited, run_concurrently(
+                *(lambda action=action: get_daily_usage(user["id"], action, today) for action in limited)
+            ))) if limited else {}
+        except Exception as e:
+            st.error(f"Error loading usage: {str(e)}")
+            usages = {}
+        
         for action, limit in limits.items():
             if limit == -1:
                 st.write(f"• {action}: Unlimited")
             else:
-                usage = get_daily_usage(user["id"], action)
-                st.write(f"• {action}: {usage}/{limit}")
+                st.write(f"• {action}: {usages.get(action, '?')}/{limit}")
     
-    # Route to appropriate page
-    if page == "Dashboard":
-        show_dashboard()
-    elif page == "Product Sourcing":
-        enhanced_product_sourcing()
-    elif page == "AI Suggestions":
-        industry_ai_suggestions()
-    elif page == "Custom Branding":
-        branding_manager()
-    elif page == "Social Trends":
-        trend_monitor()
-    elif page == "Order Management":
-        order_manager()
-    elif page == "Analytics" or page == "My Analytics":
-        user_analytics()
-    elif page == "Admin Panel" and user.get("is_admin"):
-        admin_dashboard()
+    page.run()
+
+# Page entry points import their module on first use, so each rerun only
+# loads the page being viewed
+def product_sourcing_page():
+    from product_sourcing import enhanced_product_sourcing
+    enhanced_product_sourcing()
+
+def ai_suggestions_page():
+    from ai_suggestions import industry_ai_suggestions
+    industry_ai_suggestions()
+
+def custom_branding_page():
+    from custom_branding import branding_manager
+    branding_manager()
+
+def social_trends_page():
+    from social_trends import trend_monitor
+    trend_monitor()
+
+def order_management_page():
+    from order_management import order_manager
+    order_manager()
+
+def analytics_page():
+    from analytics import user_analytics
+    user_analytics()
+
+def admin_panel_page():
+    from admin_dashboard import admin_dashboard
+    admin_dashboard()
+
+def get_pages():
+    """Navigation pages by name"""
+    return {
+        "Dashboard": st.Page(show_dashboard, title="Dashboard", icon="📊", default=True),
+        "Product Sourcing": st.Page(product_sourcing_page, title="Product Sourcing", icon="🔍"),
+        "AI Suggestions": st.Page(ai_suggestions_page, title="AI Suggestions", icon="🤖"),
+        "Custom Branding": st.Page(custom_branding_page, title="Custom Branding", icon="🎨"),
+        "Social Trends": st.Page(social_trends_page, title="Social Trends", icon="📈"),
+        "Order Management": st.Page(order_management_page, title="Order Management", icon="📦"),
+        "Analytics": st.Page(analytics_page, title="Analytics", icon="📉"),
+        "My Analytics": st.Page(analytics_page, title="My Analytics", icon="📉"),
+        "Admin Panel": st.Page(admin_panel_page, title="Admin Panel", icon="🛠️")
+    }
 
 def show_dashboard():
     """User dashboard with key metrics"""
@@ -223,122 +281,71 @@ def show_dashboard():
     
     st.title("📊 Dashboard")
     
-    # Key metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    # Get user statistics
-    searches_today = get_daily_usage(user["id"], "search")
-    suggestions_today = get_daily_usage(user["id"], "ai_suggestion")
-    orders_total = get_user_orders_count(user["id"])
-    last_activity = get_last_activity(user["id"])
-    
-    with col1:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("Searches Today", searches_today)
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("AI Suggestions", suggestions_today)
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("Total Orders", orders_total)
-        st.markdown('</div>', unsafe_allow_html=True)
+    # Get user statistics (one RPC for every dashboard metric)
+    summary = get_dashboard_summary(user["id"])
+    account_age = (datetime.now(timezone.utc) - user["_created_at_dt"]).days
     
-    with col4:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("Account Age", f"{(datetime.now() - datetime.fromisoformat(user['created_at'].replace('Z', '+00:00'))).days} days")
-        st.markdown('</div>', unsafe_allow_html=True)
+    # Key metrics, sent to the browser as a single element
+    st.markdown(METRIC_CARDS_HTML.format(
+        searches_today=summary["searches_today"],
+        suggestions_today=summary["suggestions_today"],
+        orders_total=summary["orders_total"],
+        account_age=f"{account_age} days"
+    ), unsafe_allow_html=True)
     
     # Recent activity
     st.subheader("Recent Activity")
-    recent_activities = get_recent_activities(user["id"])
+    recent_activities = summary["recent_activities"]
     
     if recent_activities:
-        for activity in recent_activities[:10]:
+        for activity in recent_activities:
             with st.expander(f"{activity['action_type'].title()} - {activity['created_at'][:10]}"):
-                st.json(activity.get('details', {}))
+                st.code(orjson.dumps(activity.get('details') or {}, option=orjson.OPT_INDENT_2).decode(), language="json")
     else:
         st.info("No recent activity found. Start exploring the platform!")
     
-    # Quick actions
+    quick_actions()
+
+# A fragment, so a quick-action click doesn't recompute the metrics above it first
+@st.fragment
+def quick_actions():
+    """Dashboard quick-action buttons"""
     st.subheader("Quick Actions")
     col1, col2, col3 = st.columns(3)
     
     with col1:
         if st.button("🔍 Start Product Search", use_container_width=True):
-            st.session_state.page = "Product Sourcing"
-            st.experimental_rerun()
+            st.switch_page(get_pages()["Product Sourcing"])
     
     with col2:
         if st.button("🤖 Get AI Suggestions", use_container_width=True):
-            st.session_state.page = "AI Suggestions"
-            st.experimental_rerun()
+            st.switch_page(get_pages()["AI Suggestions"])
     
     with col3:
         if st.button("🎨 Manage Branding", use_container_width=True):
-            st.session_state.page = "Custom Branding"
-            st.experimental_rerun()
+            st.switch_page(get_pages()["Custom Branding"])
 
 # Helper functions
-def get_subscription_limits(tier):
-    """Get subscription limits for tier"""
-    limits = {
-        "basic": {
-            "searches": 10,
-            "ai_suggestions": 5,
-            "image_generations": 3,
-            "quotes": 5
-        },
-        "premium": {
-            "searches": 100,
-            "ai_suggestions": 50,
-            "image_generations": 25,
-            "quotes": 50
-        },
-        "enterprise": {
-            "searches": -1,
-            "ai_suggestions": -1,
-            "image_generations": -1,
-            "quotes": -1
-        }
-    }
-    return limits.get(tier, limits["basic"])
-
-def get_daily_usage(user_id, action_type):
-    """Get daily usage count for user action"""
-    today = datetime.now().date().isoformat()
+def get_dashboard_summary(user_id):
+    """Get dashboard metrics and recent activity for user in one request"""
     try:
-        result = supabase.table("user_activity").select("*").eq("user_id", user_id).eq("action_type", action_type).gte("created_at", today).execute()
-        return len(result.data) if result.data else 0
+        summary = fetch_dashboard_summary(user_id)
+        if summary:
+            return summary
     except:
-        return 0
-
-def get_user_orders_count(user_id):
-    """Get total orders count for user"""
-    try:
-        result = supabase.table("orders").select("*").eq("user_id", user_id).execute()
-        return len(result.data) if result.data else 0
-    except:
-        return 0
-
-def get_last_activity(user_id):
-    """Get user's last activity"""
-    try:
-        result = supabase.table("user_activity").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(1).execute()
-        return result.data[0] if result.data else None
-    except:
-        return None
+        pass
+    return {
+        "searches_today": 0,
+        "suggestions_today": 0,
+        "orders_total": 0,
+        "recent_activities": []
+    }
 
-def get_recent_activities(user_id):
-    """Get recent user activities"""
-    try:
-        result = supabase.table("user_activity").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(20).execute()
-        return result.data if result.data else []
-    except:
-        return []
+# Failures raise out of the cached call, so only real results are kept
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_dashboard_summary(user_id):
+    """Run the dashboard_summary RPC"""
+    return supabase.rpc("dashboard_summary", {"uid": user_id}).execute().data
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,25 +1,59 @@
 import streamlit as st
 import hashlib
+import hmac
 import secrets
-from supabase import create_client, Client
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
+from supabase import Client
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+from database import get_supabase
+from limits import get_daily_limit
+from activity_logger import activity_buffer
+from mailer import smtp_worker
 import os
 from datetime import datetime, timedelta
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
-# Initialize Supabase client
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_ANON_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+# Shared Supabase client (created once per server process, not per rerun)
+supabase: Client = get_supabase()
+
+logger = logging.getLogger(__name__)
+
+# Postgres error code for a unique constraint violation
+UNIQUE_VIOLATION = "23505"
+
+RESET_SENT_MESSAGE = "If that email is registered, a reset link is on its way. Check your inbox."
+
+# Background writer for last_login updates
+_login_write_pool = ThreadPoolExecutor(max_workers=2)
+
+# Argon2id with the OWASP-recommended minimum cost (19 MiB, 2 passes)
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
 
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password using Argon2id"""
+    return _password_hasher.hash(password)
+
+def is_legacy_hash(hashed: str) -> bool:
+    """Whether a stored hash is an old unsalted SHA-256 hex digest"""
+    return len(hashed) == 64 and all(c in "0123456789abcdef" for c in hashed)
 
 def verify_password(password: str, hashed: str) -> bool:
-    """Verify password against hash"""
-    return hash_password(password) == hashed
+    """Verify password against hash in constant time"""
+    if is_legacy_hash(hashed):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed)
+    try:
+        return _password_hasher.verify(hashed, password)
+    except (VerifyMismatchError, InvalidHashError):
+        return False
+
+def password_needs_rehash(hashed: str) -> bool:
+    """Whether a verified hash should be upgraded to current Argon2 parameters"""
+    return is_legacy_hash(hashed) or _password_hasher.check_needs_rehash(hashed)
 
 def generate_reset_token() -> str:
     """Generate secure reset token"""
@@ -28,8 +62,6 @@ def generate_reset_token() -> str:
 def send_reset_email(email: str, reset_token: str):
     """Send password reset email"""
     try:
-        smtp_server = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
-        smtp_port = int(os.environ.get("SMTP_PORT", "587"))
         smtp_username = os.environ.get("SMTP_USERNAME")
         smtp_password = os.environ.get("SMTP_PASSWORD")
         
@@ -61,11 +93,8 @@ def send_reset_email(email: str, reset_token: str):
         
         msg.attach(MIMEText(body, 'plain'))
         
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(smtp_username, smtp_password)
-        server.send_message(msg)
-        server.quit()
+        # Delivered by the background worker over a kept-alive connection
+        smtp_worker.send(msg)
         
         return True
     except Exception as e:
@@ -75,16 +104,7 @@ def send_reset_email(email: str, reset_token: str):
 def create_user(username: str, email: str, password: str, subscription_tier: str = "basic") -> bool:
     """Create new user account"""
     try:
-        # Check if user already exists
-        existing_user = supabase.table("users").select("*").eq("username", username).execute()
-        if existing_user.data:
-            return False, "Username already exists"
-            
-        existing_email = supabase.table("users").select("*").eq("email", email).execute()
-        if existing_email.data:
-            return False, "Email already registered"
-        
-        # Create user
+        # Create user (the username/email unique constraints reject duplicates)
         user_data = {
             "username": username,
             "email": email,
@@ -96,9 +116,17 @@ def create_user(username: str, email: str, password: str, subscription_tier: str
             "is_admin": False
         }
         
-        result = supabase.table("users").insert(user_data).execute()
+        supabase.table("users").insert(user_data, returning=ReturnMethod.minimal).execute()
         return True, "Account created successfully"
         
+    except APIError as e:
+        if str(e.code) == UNIQUE_VIOLATION:
+            conflict = f"{e.message} {e.details}"
+            if "username" in conflict:
+                return False, "Username already exists"
+            if "email" in conflict:
+                return False, "Email already registered"
+        return False, f"Error creating account: {str(e)}"
     except Exception as e:
         return False, f"Error creating account: {str(e)}"
 
@@ -118,23 +146,34 @@ def authenticate_user(username: str, password: str) -> tuple:
         if user_data["subscription_status"] != "active":
             return False, None, "Account suspended or inactive"
         
-        # Update last login
-        supabase.table("users").update({
-            "last_login": datetime.now().isoformat()
-        }).eq("id", user_data["id"]).execute()
+        # Update last login, upgrading legacy or outdated password hashes
+        login_update = {"last_login": datetime.now().isoformat()}
+        if password_needs_rehash(user_data["password_hash"]):
+            login_update["password_hash"] = hash_password(password)
+        
+        # Nothing on the login path reads it back, so don't wait for the write
+        _login_write_pool.submit(
+            lambda: supabase.table("users").update(login_update).eq("id", user_data["id"]).execute()
+        ).add_done_callback(_log_login_write_failure)
         
         return True, user_data, "Login successful"
         
     except Exception as e:
         return False, None, f"Login error: {str(e)}"
 
+def _log_login_write_failure(future):
+    """Log a background last_login update that raised"""
+    if future.exception():
+        logger.error("Failed to record login: %s", future.exception())
+
 def initiate_password_reset(email: str) -> bool:
     """Initiate password reset process"""
     try:
-        user = supabase.table("users").select("*").eq("email", email).execute()
+        user = supabase.table("users").select("id").eq("email", email).limit(1).execute()
         
+        # Same answer whether or not the email exists, so accounts can't be probed
         if not user.data:
-            return False, "Email not found"
+            return True, RESET_SENT_MESSAGE
             
         reset_token = generate_reset_token()
         expires_at = (datetime.now() + timedelta(hours=1)).isoformat()
@@ -146,11 +185,11 @@ def initiate_password_reset(email: str) -> bool:
             "expires_at": expires_at,
             "used": False,
             "created_at": datetime.now().isoformat()
-        }).execute()
+        }, returning=ReturnMethod.minimal).execute()
         
         # Send reset email
         if send_reset_email(email, reset_token):
-            return True, "Reset email sent successfully"
+            return True, RESET_SENT_MESSAGE
         else:
             return False, "Failed to send reset email"
             
@@ -161,7 +200,7 @@ def reset_password(reset_token: str, new_password: str) -> tuple:
     """Reset password using token"""
     try:
         # Verify token
-        reset_data = supabase.table("password_resets").select("*").eq("reset_token", reset_token).eq("used", False).execute()
+        reset_data = supabase.table("password_resets").select("id, user_id, expires_at").eq("reset_token", reset_token).eq("used", False).limit(1).execute()
         
         if not reset_data.data:
             return False, "Invalid or expired reset token"
@@ -187,72 +226,59 @@ def reset_password(reset_token: str, new_password: str) -> tuple:
     except Exception as e:
         return False, f"Reset error: {str(e)}"
 
-def get_user_subscription_info(user_id: int) -> dict:
-    """Get user subscription details"""
-    try:
-        user = supabase.table("users").select("*").eq("id", user_id).execute()
-        if user.data:
-            return user.data[0]
-        return None
-    except Exception as e:
-        st.error(f"Error fetching subscription info: {str(e)}")
-        return None
+# Tier changes clear this (see admin_dashboard.invalidate_user_caches)
+@st.cache_data(ttl=300, show_spinner=False)
+def get_user_tier(user_id) -> str:
+    """Get user's subscription tier, or None if the user can't be found (errors raise, so they aren't cached)"""
+    user = supabase.table("users").select("subscription_tier").eq("id", user_id).limit(1).execute()
+    if user.data:
+        return user.data[0].get("subscription_tier") or "basic"
+    return None
 
 def check_subscription_limits(user_id: int, action_type: str) -> bool:
     """Check if user can perform action based on subscription tier"""
-    user_info = get_user_subscription_info(user_id)
-    if not user_info:
-        return False
-        
-    tier = user_info.get("subscription_tier", "basic")
-    
-    # Define limits per tier
-    limits = {
-        "basic": {
-            "searches_per_day": 10,
-            "ai_suggestions_per_day": 5,
-            "image_generations_per_day": 3,
-            "quotes_per_day": 5
-        },
-        "premium": {
-            "searches_per_day": 100,
-            "ai_suggestions_per_day": 50,
-            "image_generations_per_day": 25,
-            "quotes_per_day": 50
-        },
-        "enterprise": {
-            "searches_per_day": -1,  # Unlimited
-            "ai_suggestions_per_day": -1,
-            "image_generations_per_day": -1,
-            "quotes_per_day": -1
-        }
-    }
+    return get_remaining_quota(user_id, action_type) != 0
+
+def get_remaining_quota(user_id: int, action_type: str) -> int:
+    """Get how many more times the user can perform action today (-1 means unlimited)"""
+    # Quota checks fail closed: an unknown tier allows nothing
+    try:
+        tier = get_user_tier(user_id)
+    except Exception as e:
+        st.error(f"Error fetching subscription info: {str(e)}")
+        return 0
+    if not tier:
+        return 0
     
-    if tier not in limits:
-        return False
-        
-    tier_limits = limits[tier]
-    daily_limit = tier_limits.get(f"{action_type}_per_day", 0)
+    daily_limit = get_daily_limit(tier, action_type)
     
     if daily_limit == -1:  # Unlimited
-        return True
+        return -1
         
     # Check today's usage
     today = datetime.now().date().isoformat()
-    usage = supabase.table("user_activity").select("*").eq("user_id", user_id).eq("action_type", action_type).gte("created_at", today).execute()
-    
-    return len(usage.data) < daily_limit
-
-def log_user_activity(user_id: int, action_type: str, details: dict = None):
-    """Log user activity for analytics"""
     try:
-        activity_data = {
-            "user_id": user_id,
-            "action_type": action_type,
-            "details": details or {},
-            "created_at": datetime.now().isoformat()
-        }
-        
-        supabase.table("user_activity").insert(activity_data).execute()
+        used = get_daily_usage(user_id, action_type, today)
     except Exception as e:
-        st.error(f"Error logging activity: {str(e)}")
\ No newline at end of file
+        st.error(f"Error checking today's usage: {str(e)}")
+        return 0
+    return max(daily_limit - used, 0)
+
+# The day is part of the key so counts roll over at midnight; activity writes clear the cache
+@st.cache_data(ttl=60, show_spinner=False)
+def get_daily_usage(user_id, action_type: str, day: str) -> int:
+    """Get usage count for user action since the start of day (errors raise, so they aren't cached)"""
+    result = supabase.table("user_activity").select("id", count="exact", head=True).eq("user_id", user_id).eq("action_type", action_type).gte("created_at", day).execute()
+    return result.count or 0
+
+# Usage counts are refreshed once queued activity has actually been written
+activity_buffer.on_flush(get_daily_usage.clear)
+
+def log_user_activity(user_id: int, action_type: str, details: dict = None):
+    """Log user activity for analytics (queued and written in the background)"""
+    activity_buffer.append({
+        "user_id": user_id,
+        "action_type": action_type,
+        "details": details or {},
+        "created_at": datetime.now().isoformat()
+    })
\ No newline at end of file
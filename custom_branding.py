@@ -1,17 +1,50 @@
 import streamlit as st
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageColor, ImageDraw, ImageFont, ImageOps
 import io
 import base64
-from datetime import datetime
+import simplejpeg
+import numpy as np
+from functools import lru_cache
 from auth import log_user_activity
-from supabase import create_client, Client
-import os
+from supabase import Client
+from database import get_supabase
 import requests
+from requests.adapters import HTTPAdapter
 
-# Initialize Supabase client
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_ANON_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+# Shared Supabase client (created once per server process, not per rerun)
+supabase: Client = get_supabase()
+
+# TrueType files to try for each brand font, in order (the first one found is used)
+FONT_FILES = {
+    "Arial": ["arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf", "DejaVuSans.ttf"],
+    "Helvetica": ["Helvetica.ttc", "LiberationSans-Regular.ttf", "DejaVuSans.ttf"],
+    "Times New Roman": ["times.ttf", "Times New Roman.ttf", "LiberationSerif-Regular.ttf", "DejaVuSerif.ttf"],
+    "Georgia": ["georgia.ttf", "Georgia.ttf", "DejaVuSerif.ttf"],
+    "Verdana": ["verdana.ttf", "Verdana.ttf", "DejaVuSans.ttf"],
+    "Trebuchet MS": ["trebuc.ttf", "Trebuchet MS.ttf", "DejaVuSans.ttf"]
+}
+DESIGN_FONT_SIZE = 24
+BRAND_NAME_FONT_SIZE = 18
+
+# Remote product images: size cap and the decode size requested from JPEG drafts
+MAX_REMOTE_IMAGE_BYTES = 20 * 1024 * 1024
+REMOTE_IMAGE_DRAFT_SIZE = (1024, 1024)
+REMOTE_IMAGE_TIMEOUT = (3, 10)
+
+# Pooled session so repeat fetches from the same host reuse the TLS connection
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+_http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+
+# Longest side product images are branded at
+MAX_BRANDING_DIMENSION = 1600
+
+# WCAG 2 luminance weights and the AA contrast threshold for normal text
+LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+WCAG_AA_CONTRAST = 4.5
+
+# Public Supabase Storage bucket holding uploaded logos, one object per user
+LOGO_BUCKET = "brand-logos"
 
 def branding_manager():
     """Custom branding management system"""
@@ -138,23 +171,24 @@ def design_tools_interface(user, existing_branding):
             
             content = {"main_text": main_text, "subtitle": subtitle}
         
+        # Designs are opaque, so JPEG is a smaller, faster alternative to PNG
+        download_format = st.radio("Download Format", ["PNG", "JPEG"], horizontal=True)
+        
         # Generate design
         if st.button(f"🎨 Generate {template_type}", type="primary"):
             with st.spinner("Generating design..."):
                 design_image = generate_branded_design(template_type, content, existing_branding)
                 if design_image:
-                    st.image(design_image, caption=f"Generated {template_type}")
+                    # Encode once and reuse the bytes for both display and download
+                    image_bytes, mime, extension = encode_image(design_image, download_format)
+                    st.image(image_bytes, caption=f"Generated {template_type}")
                     
                     # Download button
-                    img_buffer = io.BytesIO()
-                    design_image.save(img_buffer, format='PNG')
-                    img_buffer.seek(0)
-                    
                     st.download_button(
                         label=f"📥 Download {template_type}",
-                        data=img_buffer.getvalue(),
-                        file_name=f"{template_type.lower().replace(' ', '_')}.png",
-                        mime="image/png"
+                        data=image_bytes,
+                        file_name=f"{template_type.lower().replace(' ', '_')}.{extension}",
+                        mime=mime
                     )
                     
                     # Log activity
@@ -171,21 +205,32 @@ def design_tools_interface(user, existing_branding):
             # Color swatches
             col_a, col_b = st.columns(2)
             with col_a:
-                st.markdown(f"""
-                <div style="background-color: {existing_branding.get('primary_color', '#000000')}; 
-                           height: 50px; border-radius: 5px; margin: 5px;"></div>
-                <p style="text-align: center; font-size: 12px;">Primary</p>
-                """, unsafe_allow_html=True)
+                st.markdown(preview_swatch_html(existing_branding.get('primary_color', '#000000'), "Primary"), unsafe_allow_html=True)
             
             with col_b:
-                st.markdown(f"""
-                <div style="background-color: {existing_branding.get('secondary_color', '#ffffff')}; 
-                           height: 50px; border-radius: 5px; margin: 5px; border: 1px solid #ccc;"></div>
-                <p style="text-align: center; font-size: 12px;">Secondary</p>
-                """, unsafe_allow_html=True)
+                st.markdown(preview_swatch_html(existing_branding.get('secondary_color', '#ffffff'), "Secondary", bordered=True), unsafe_allow_html=True)
             
             st.write(f"**Font:** {existing_branding.get('font_family', 'Arial')}")
 
+# Swatch markup only changes with the brand colors, so it is built once per color
+@lru_cache(maxsize=128)
+def preview_swatch_html(color, label, bordered=False):
+    """Small color swatch for the brand preview"""
+    border = " border: 1px solid #ccc;" if bordered else ""
+    return f"""
+    <div style="background-color: {color}; height: 50px; border-radius: 5px; margin: 5px;{border}"></div>
+    <p style="text-align: center; font-size: 12px;">{label}</p>
+    """
+
+@lru_cache(maxsize=128)
+def asset_swatch_html(color, label, bordered=False):
+    """Large color swatch with its hex value for the brand assets tab"""
+    border = " border: 1px solid #ccc;" if bordered else ""
+    return f"""
+    <div style="background-color: {color}; height: 100px; border-radius: 10px; margin: 10px;{border}"></div>
+    <p><strong>{label}:</strong> {color}</p>
+    """
+
 def product_overlay_interface(user, existing_branding):
     """Product image overlay with branding"""
     st.header("Product Branding Overlay")
@@ -207,15 +252,14 @@ def product_overlay_interface(user, existing_branding):
         if image_source == "Upload":
             uploaded_image = st.file_uploader("Upload Product Image", type=['png', 'jpg', 'jpeg'])
             if uploaded_image:
-                product_image = Image.open(uploaded_image)
+                product_image = decode_uploaded_image(uploaded_image.getvalue())
                 st.image(product_image, width=300, caption="Original Product Image")
         
         elif image_source == "URL":
             image_url = st.text_input("Product Image URL")
             if image_url:
                 try:
-                    response = requests.get(image_url)
-                    product_image = Image.open(io.BytesIO(response.content))
+                    product_image = fetch_remote_image(image_url)
                     st.image(product_image, width=300, caption="Product Image from URL")
                 except Exception as e:
                     st.error(f"Error loading image: {str(e)}")
@@ -259,16 +303,14 @@ def product_overlay_interface(user, existing_branding):
             
             if branded_image:
                 st.subheader("Branded Product Image")
-                st.image(branded_image, caption="Branded Product Image")
+                # Encode once and reuse the bytes for both display and download
+                image_bytes, _, _ = encode_image(branded_image, "PNG")
+                st.image(image_bytes, caption="Branded Product Image")
                 
                 # Download button
-                img_buffer = io.BytesIO()
-                branded_image.save(img_buffer, format='PNG')
-                img_buffer.seek(0)
-                
                 st.download_button(
                     label="📥 Download Branded Image",
-                    data=img_buffer.getvalue(),
+                    data=image_bytes,
                     file_name="branded_product.png",
                     mime="image/png"
                 )
@@ -308,38 +350,82 @@ def brand_assets_interface(user, existing_branding):
 def load_user_branding(user_id):
     """Load user's branding configuration"""
     try:
-        result = supabase.table("custom_branding").select("*").eq("user_id", user_id).eq("is_active", True).execute()
-        return result.data[0] if result.data else None
+        return fetch_user_branding(user_id)
     except Exception as e:
         st.error(f"Error loading branding: {str(e)}")
         return None
 
+# Reruns reuse this instead of hitting Supabase; saving clears it
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_user_branding(user_id):
+    """Fetch the user's active branding row (errors raise, so they aren't cached)"""
+    result = supabase.table("custom_branding").select("*").eq("user_id", user_id).eq("is_active", True).execute()
+    return result.data[0] if result.data else None
+
+def decode_uploaded_image(data):
+    """Decode uploaded image bytes, using libjpeg-turbo directly for JPEGs"""
+    if simplejpeg.is_jpeg(data):
+        try:
+            return Image.fromarray(simplejpeg.decode_jpeg(data, colorspace='RGB'))
+        except ValueError:
+            pass  # Unusual JPEG variants fall back to Pillow's decoder
+    return Image.open(io.BytesIO(data))
+
+def fetch_remote_image(image_url):
+    """Download an image from a URL, aborting once it exceeds MAX_REMOTE_IMAGE_BYTES"""
+    with _http.get(image_url, stream=True, timeout=REMOTE_IMAGE_TIMEOUT) as response:
+        response.raise_for_status()
+        too_large = ValueError(f"Image is larger than {MAX_REMOTE_IMAGE_BYTES // (1024 * 1024)} MB")
+        if int(response.headers.get("Content-Length") or 0) > MAX_REMOTE_IMAGE_BYTES:
+            raise too_large
+        
+        # The header may be missing or wrong (e.g. chunked responses), so the body
+        # itself is capped while it downloads
+        buffer = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            buffer.write(chunk)
+            if buffer.tell() > MAX_REMOTE_IMAGE_BYTES:
+                raise too_large
+        buffer.seek(0)
+        
+        image = Image.open(buffer)
+        # JPEGs are decoded straight to (at least) overlay resolution via DCT scaling
+        image.draft('RGB', REMOTE_IMAGE_DRAFT_SIZE)
+        image.load()
+        return image
+
+def encode_image(image, image_format):
+    """Encode an image for download, returning (bytes, mime type, file extension)"""
+    img_buffer = io.BytesIO()
+    if image_format == "JPEG":
+        image.convert('RGB').save(img_buffer, format='JPEG', quality=85, subsampling=2)
+        return img_buffer.getvalue(), "image/jpeg", "jpg"
+    
+    # Download buffers are short-lived, so favor encode speed over file size
+    image.save(img_buffer, format='PNG', compress_level=1, optimize=False)
+    return img_buffer.getvalue(), "image/png", "png"
+
 def save_brand_configuration(user_id, branding_data, logo_file):
     """Save brand configuration to database"""
     try:
         # Handle logo upload if provided
         logo_url = None
         if logo_file:
-            # In production, upload to Supabase storage
-            logo_url = "https://via.placeholder.com/200x200?text=Logo"  # Placeholder
-        
-        # Deactivate existing branding
-        supabase.table("custom_branding").update({"is_active": False}).eq("user_id", user_id).execute()
-        
-        # Insert new branding
-        branding_record = {
-            "user_id": user_id,
-            "brand_name": branding_data["brand_name"],
-            "logo_url": logo_url,
-            "primary_color": branding_data["primary_color"],
-            "secondary_color": branding_data["secondary_color"],
-            "font_family": branding_data["font_family"],
-            "brand_guidelines": branding_data["brand_guidelines"],
-            "is_active": True,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        supabase.table("custom_branding").insert(branding_record).execute()
+            logo_url = upload_logo(user_id, logo_file)
+        
+        # Replace the active branding in one transaction
+        supabase.rpc("upsert_branding", {
+            "p_user_id": user_id,
+            "p_payload": {
+                "brand_name": branding_data["brand_name"],
+                "logo_url": logo_url,
+                "primary_color": branding_data["primary_color"],
+                "secondary_color": branding_data["secondary_color"],
+                "font_family": branding_data["font_family"],
+                "brand_guidelines": branding_data["brand_guidelines"]
+            }
+        }).execute()
+        fetch_user_branding.clear()
         
         st.success("Brand configuration saved successfully!")
         
@@ -349,101 +435,184 @@ def save_brand_configuration(user_id, branding_data, logo_file):
             "logo_uploaded": logo_file is not None
         })
         
-        st.experimental_rerun()
+        st.rerun()
         
     except Exception as e:
         st.error(f"Error saving branding: {str(e)}")
 
+def upload_logo(user_id, logo_file):
+    """Upload the logo's raw bytes to Supabase Storage and return its public URL"""
+    # The same file is only uploaded once, however many times the page reruns
+    if st.session_state.get("brand_logo_file_id") == logo_file.file_id:
+        return st.session_state.brand_logo_url
+    
+    ext = logo_file.name.rsplit('.', 1)[-1].lower()
+    path = f"{user_id}/logo.{ext}"
+    bucket = supabase.storage.from_(LOGO_BUCKET)
+    bucket.upload(path, logo_file.getvalue(), {"content-type": logo_file.type, "upsert": "true"})
+    logo_url = bucket.get_public_url(path)
+    
+    st.session_state.brand_logo_file_id = logo_file.file_id
+    st.session_state.brand_logo_url = logo_url
+    return logo_url
+
+@lru_cache(maxsize=256)
+def get_rgb(color):
+    """Parse a brand hex color into an (r, g, b) tuple once per distinct color"""
+    return ImageColor.getrgb(color)[:3]
+
+def relative_luminance(colors):
+    """WCAG relative luminance for a list of hex colors, computed as one array"""
+    rgb = np.array([get_rgb(color) for color in colors]) / 255.0
+    rgb = np.where(rgb <= 0.03928, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    return rgb @ LUMINANCE_WEIGHTS
+
+def contrast_ratio(color_a, color_b):
+    """WCAG contrast ratio between two hex colors (1.0 to 21.0)"""
+    darker, lighter = np.sort(relative_luminance([color_a, color_b]))
+    return float((lighter + 0.05) / (darker + 0.05))
+
+@lru_cache(maxsize=64)
+def get_font(font_family, size):
+    """Load a brand font once per (family, size), falling back to Pillow's default font"""
+    for font_file in FONT_FILES.get(font_family, FONT_FILES["Arial"]):
+        try:
+            return ImageFont.truetype(font_file, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
 def generate_branded_design(template_type, content, branding):
     """Generate branded design based on template"""
     try:
-        # Create base image
-        if template_type == "Business Card":
-            img = Image.new('RGB', (600, 350), color=branding.get("secondary_color", "#ffffff"))
-        elif template_type == "Product Label":
-            img = Image.new('RGB', (400, 300), color=branding.get("secondary_color", "#ffffff"))
-        else:
-            img = Image.new('RGB', (800, 600), color=branding.get("secondary_color", "#ffffff"))
-        
-        draw = ImageDraw.Draw(img)
-        
-        # Add brand colors and text
-        primary_color = branding.get("primary_color", "#000000")
-        
-        # Simple text rendering (in production, use proper font loading)
-        if template_type == "Business Card":
-            draw.text((50, 50), content["name"], fill=primary_color)
-            draw.text((50, 100), content["title"], fill=primary_color)
-            draw.text((50, 150), content["email"], fill=primary_color)
-            draw.text((50, 200), content["phone"], fill=primary_color)
-        
-        elif template_type == "Product Label":
-            draw.text((50, 50), content["product_name"], fill=primary_color)
-            draw.text((50, 100), content["description"], fill=primary_color)
-            draw.text((50, 200), content["price"], fill=primary_color)
-        
-        else:
-            draw.text((100, 200), content["main_text"], fill=primary_color)
-            draw.text((100, 300), content["subtitle"], fill=primary_color)
-        
-        # Add brand name
-        brand_name = branding.get("brand_name", "")
-        if brand_name:
-            draw.text((img.width - 200, img.height - 50), brand_name, fill=primary_color)
-        
-        return img
-        
+        return render_branded_design(template_type, content, branding)
     except Exception as e:
         st.error(f"Error generating design: {str(e)}")
         return None
 
+# Identical inputs (e.g. regenerating after an unrelated widget change) reuse the
+# rendered image; st.cache_data hands back a fresh copy each time
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def render_branded_design(template_type, content, branding):
+    """Render a branded design image for a template"""
+    # Create base image
+    background = get_rgb(branding.get("secondary_color", "#ffffff"))
+    if template_type == "Business Card":
+        img = Image.new('RGB', (600, 350), color=background)
+    elif template_type == "Product Label":
+        img = Image.new('RGB', (400, 300), color=background)
+    else:
+        img = Image.new('RGB', (800, 600), color=background)
+    
+    draw = ImageDraw.Draw(img)
+    
+    # Add brand colors and text
+    primary_color = get_rgb(branding.get("primary_color", "#000000"))
+    font_family = branding.get("font_family", "Arial")
+    font = get_font(font_family, DESIGN_FONT_SIZE)
+    
+    if template_type == "Business Card":
+        draw.text((50, 50), content["name"], fill=primary_color, font=font)
+        draw.text((50, 100), content["title"], fill=primary_color, font=font)
+        draw.text((50, 150), content["email"], fill=primary_color, font=font)
+        draw.text((50, 200), content["phone"], fill=primary_color, font=font)
+    
+    elif template_type == "Product Label":
+        draw.text((50, 50), content["product_name"], fill=primary_color, font=font)
+        draw.text((50, 100), content["description"], fill=primary_color, font=font)
+        draw.text((50, 200), content["price"], fill=primary_color, font=font)
+    
+    else:
+        draw.text((100, 200), content["main_text"], fill=primary_color, font=font)
+        draw.text((100, 300), content["subtitle"], fill=primary_color, font=font)
+    
+    # Add brand name
+    brand_name = branding.get("brand_name", "")
+    if brand_name:
+        draw.text((img.width - 200, img.height - 50), brand_name, fill=primary_color, font=get_font(font_family, BRAND_NAME_FONT_SIZE))
+    
+    return img
+
 def apply_product_branding(product_image, branding, overlay_type, position, size, opacity, text=None, text_size=24):
     """Apply branding overlay to product image"""
     try:
-        # Create a copy of the product image
-        branded_img = product_image.copy()
+        # Large photos are scaled down first so every later step handles fewer pixels
+        if max(product_image.size) > MAX_BRANDING_DIMENSION:
+            product_image = ImageOps.contain(product_image, (MAX_BRANDING_DIMENSION, MAX_BRANDING_DIMENSION), Image.Resampling.LANCZOS)
         
-        # Create overlay
-        overlay = Image.new('RGBA', branded_img.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
+        # Work on an RGB copy of the product image; only the overlay carries alpha
+        branded_img = product_image.copy() if product_image.mode == 'RGB' else product_image.convert('RGB')
         
         # Calculate position
         img_width, img_height = branded_img.size
         overlay_width = int(img_width * size / 100)
         overlay_height = int(img_height * size / 100)
         
-        positions = {
-            "Top Left": (20, 20),
-            "Top Right": (img_width - overlay_width - 20, 20),
-            "Bottom Left": (20, img_height - overlay_height - 20),
-            "Bottom Right": (img_width - overlay_width - 20, img_height - overlay_height - 20),
-            "Center": ((img_width - overlay_width) // 2, (img_height - overlay_height) // 2)
-        }
-        
-        x, y = positions[position]
+        # Only the chosen position is computed
+        if position == "Top Left":
+            x, y = 20, 20
+        elif position == "Top Right":
+            x, y = img_width - overlay_width - 20, 20
+        elif position == "Bottom Left":
+            x, y = 20, img_height - overlay_height - 20
+        elif position == "Bottom Right":
+            x, y = img_width - overlay_width - 20, img_height - overlay_height - 20
+        elif position == "Center":
+            x, y = (img_width - overlay_width) // 2, (img_height - overlay_height) // 2
+        else:
+            raise KeyError(position)
         
         # Add branding elements
-        primary_color = branding.get("primary_color", "#000000")
+        fill = get_rgb(branding.get("primary_color", "#000000")) + (int(opacity * 2.55),)
+        show_text = overlay_type in ["Logo + Text", "Full Branding"] and text
+        
+        # The overlay only covers the branded area (plus a text band below it),
+        # so compositing touches those pixels rather than the whole image
+        overlay_size = (overlay_width, overlay_height)
+        if show_text:
+            font = get_font(branding.get("font_family", "Arial"), text_size)
+            text_width = int(ImageDraw.Draw(branded_img).textlength(text, font=font))
+            overlay_size = (max(overlay_width, text_width + 10), overlay_height + text_size + 20)
+        overlay = Image.new('RGBA', overlay_size, (0, 0, 0, 0))
         
         if overlay_type in ["Logo Only", "Logo + Text", "Full Branding"]:
-            # Placeholder for logo (in production, load actual logo)
-            overlay_draw.rectangle([x, y, x + overlay_width, y + overlay_height], 
-                                 fill=primary_color + f"{int(opacity * 2.55):02x}")
+            # Placeholder for logo (in production, load actual logo), filled as one block
+            overlay.paste(fill, (0, 0, overlay_width, overlay_height))
         
-        if overlay_type in ["Logo + Text", "Full Branding"] and text:
+        if show_text:
             # Add text
-            overlay_draw.text((x + 10, y + overlay_height + 10), text, 
-                            fill=primary_color + f"{int(opacity * 2.55):02x}")
+            ImageDraw.Draw(overlay).text((10, overlay_height + 10), text, fill=fill, font=font)
         
-        # Composite the overlay onto the product image
-        branded_img = Image.alpha_composite(branded_img.convert('RGBA'), overlay)
+        # Opaque branding needs no blend math: the overlay's alpha only masks out its
+        # empty text band, which paste handles natively
+        if opacity >= 100:
+            branded_img.paste(overlay, (x, y), overlay)
+        else:
+            blend_overlay(branded_img, overlay, (x, y))
         
-        return branded_img.convert('RGB')
+        return branded_img
         
     except Exception as e:
         st.error(f"Error applying branding: {str(e)}")
         return None
 
+def _as_array(img):
+    """View a PIL image's pixels as a NumPy array"""
+    return np.asarray(img)
+
+def _from_array(arr):
+    """Build a PIL image from a uint8 NumPy array"""
+    return Image.fromarray(arr)
+
+def blend_overlay(base, overlay, dest):
+    """Alpha-blend an RGBA overlay onto the region of an RGB image at dest, in place"""
+    box = (dest[0], dest[1], dest[0] + overlay.width, dest[1] + overlay.height)
+    pixels = _as_array(overlay).astype(np.float32)
+    alpha = pixels[..., 3:] / 255.0
+    background = _as_array(base.crop(box)).astype(np.float32)
+    blended = pixels[..., :3] * alpha + background * (1.0 - alpha)
+    base.paste(_from_array((blended + 0.5).astype(np.uint8)), box[:2])
+
 def show_logo_assets(user, branding):
     """Show logo assets"""
     st.subheader("Logo Assets")
@@ -484,18 +653,17 @@ def show_color_assets(branding):
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown(f"""
-        <div style="background-color: {branding.get('primary_color', '#000000')}; 
-                   height: 100px; border-radius: 10px; margin: 10px;"></div>
-        <p><strong>Primary Color:</strong> {branding.get('primary_color', '#000000')}</p>
-        """, unsafe_allow_html=True)
+        st.markdown(asset_swatch_html(branding.get('primary_color', '#000000'), "Primary Color"), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div style="background-color: {branding.get('secondary_color', '#ffffff')}; 
-                   height: 100px; border-radius: 10px; margin: 10px; border: 1px solid #ccc;"></div>
-        <p><strong>Secondary Color:</strong> {branding.get('secondary_color', '#ffffff')}</p>
-        """, unsafe_allow_html=True)
+        st.markdown(asset_swatch_html(branding.get('secondary_color', '#ffffff'), "Secondary Color", bordered=True), unsafe_allow_html=True)
+    
+    # Primary text on the secondary background, as used in generated designs
+    ratio = contrast_ratio(branding.get('primary_color', '#000000'), branding.get('secondary_color', '#ffffff'))
+    if ratio >= WCAG_AA_CONTRAST:
+        st.success(f"Contrast ratio {ratio:.2f}:1 - passes WCAG AA for text")
+    else:
+        st.warning(f"Contrast ratio {ratio:.2f}:1 - below the WCAG AA minimum of {WCAG_AA_CONTRAST}:1 for text")
 
 def show_brand_guidelines(branding):
     """Show brand guidelines"""
@@ -0,0 +1,69 @@
+import os
+import time
+import atexit
+import random
+import httpx
+import threading
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from concurrent.futures import ThreadPoolExecutor
+from postgrest.exceptions import APIError
+from supabase import create_client, Client, ClientOptions
+
+# PostgREST reports gateway/rate-limit failures with the HTTP status as the error code
+RETRYABLE_STATUS_CODES = {"429", "500", "502", "503", "504"}
+
+def create_supabase_client() -> Client:
+    """
+    Create a Supabase client backed by a pooled, keep-alive HTTP/2 connection
+    so concurrent requests reuse TLS sessions instead of opening new ones.
+    """
+    supabase_url = os.environ.get("SUPABASE_URL")
+    supabase_key = os.environ.get("SUPABASE_ANON_KEY")
+    
+    http_client = httpx.Client(
+        http2=True,
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=300)
+    )
+    atexit.register(http_client.close)
+    options = ClientOptions(
+        postgrest_client_timeout=10,
+        storage_client_timeout=10,
+        httpx_client=http_client
+    )
+    return create_client(supabase_url, supabase_key, options=options)
+
+@st.cache_resource
+def get_supabase() -> Client:
+    """Shared Supabase client, created once per server process"""
+    return create_supabase_client()
+
+def execute_with_retry(query, retries=4):
+    """
+    Execute a Supabase query, retrying rate-limited (429) and transient gateway
+    errors with jittered exponential backoff. Only pass reads or idempotent
+    updates, since a retried request may already have been applied.
+    """
+    for attempt in range(retries):
+        try:
+            return query.execute()
+        except (APIError, httpx.TransportError) as e:
+            if attempt == retries - 1 or not is_retryable_error(e):
+                raise
+            time.sleep(min(2 ** attempt, 8) + random.random())
+
+def is_retryable_error(error) -> bool:
+    """Whether a failed request is worth retrying"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    return str(getattr(error, "code", "")) in RETRYABLE_STATUS_CODES
+
+def run_concurrently(*calls):
+    """Run independent Supabase reads in worker threads, returning results in call order"""
+    # Workers share the caller's script context, so st.cache_* lookups and any
+    # st.error inside the calls behave as they would on the script thread
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=len(calls), initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as executor:
+        futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
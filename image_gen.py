@@ -1,6 +1,24 @@
 import replicate
 import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from rate_limit import replicate_limiter, retry_on_rate_limit
 
+__all__ = ["generate_image", "generate_images"]
+
+logger = logging.getLogger(__name__)
+
+# Predictions run on separate Replicate workers, so a batch is fanned out up to this many at once
+MAX_CONCURRENT_GENERATIONS = 8
+
+@lru_cache(maxsize=1)
+def _get_model(api_key: str):
+    """Return the Stable Diffusion model handle, fetched from Replicate once per key"""
+    client = replicate.Client(api_token=api_key)
+    return client.models.get("stability-ai/stable-diffusion")
+
+@retry_on_rate_limit
 def generate_image(prompt: str) -> str:
     """
     Generate an image based on the prompt using Replicate's Stable Diffusion model.
@@ -10,7 +28,23 @@ def generate_image(prompt: str) -> str:
     if not replicate_api_key:
         return "Replicate API key not set."
 
-    client = replicate.Client(api_token=replicate_api_key)
-    model = client.models.get("stability-ai/stable-diffusion")
-    output = model.predict(prompt=prompt)
+    replicate_limiter.acquire()
+    output = _get_model(replicate_api_key).predict(prompt=prompt)
     return output[0]  # Returns the first generated image URL
+
+def _generate_image_or_none(prompt: str):
+    try:
+        return generate_image(prompt)
+    except Exception as e:
+        logger.error("Image generation failed for %r: %s", prompt, e)
+        return None
+
+def generate_images(prompts: list[str]) -> list:
+    """
+    Generate one image per prompt concurrently, returning the URLs in prompt order.
+    A prompt whose generation failed gets None, so the other images are kept.
+    """
+    if not prompts:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(prompts), MAX_CONCURRENT_GENERATIONS)) as executor:
+        return list(executor.map(_generate_image_or_none, prompts))
@@ -0,0 +1,32 @@
+from types import MappingProxyType
+
+# Daily limits per subscription tier, keyed by the action_type logged to
+# user_activity (-1 means unlimited)
+SUBSCRIPTION_LIMITS = MappingProxyType({
+    "basic": MappingProxyType({
+        "search": 10,
+        "ai_suggestion": 5,
+        "image_generation": 3,
+        "quote": 5
+    }),
+    "premium": MappingProxyType({
+        "search": 100,
+        "ai_suggestion": 50,
+        "image_generation": 25,
+        "quote": 50
+    }),
+    "enterprise": MappingProxyType({
+        "search": -1,
+        "ai_suggestion": -1,
+        "image_generation": -1,
+        "quote": -1
+    })
+})
+
+def get_subscription_limits(tier):
+    """Get subscription limits for tier, falling back to basic"""
+    return SUBSCRIPTION_LIMITS.get(tier, SUBSCRIPTION_LIMITS["basic"])
+
+def get_daily_limit(tier, action_type):
+    """Get the daily limit for an action (0 for unknown tiers or actions)"""
+    return SUBSCRIPTION_LIMITS.get(tier, {}).get(action_type, 0)
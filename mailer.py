@@ -0,0 +1,71 @@
+import os
+import queue
+import logging
+import smtplib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Idle connections are NOOP-pinged this often so the server doesn't drop them
+KEEPALIVE_INTERVAL = 30
+
+class SMTPWorker:
+    """
+    Sends queued email messages from a daemon thread over one reused SMTP
+    connection, so callers never wait on the SMTP/STARTTLS handshake.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._server = None
+
+    def send(self, message):
+        """Queue a message for delivery and return immediately"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._queue.put(message)
+
+    def _connect(self):
+        server = smtplib.SMTP(os.environ.get("SMTP_SERVER", "smtp.gmail.com"), int(os.environ.get("SMTP_PORT", "587")))
+        server.starttls()
+        server.login(os.environ.get("SMTP_USERNAME"), os.environ.get("SMTP_PASSWORD"))
+        return server
+
+    def _keepalive(self):
+        if self._server is None:
+            return
+        try:
+            self._server.noop()
+        except smtplib.SMTPException:
+            self._server = None
+
+    def _deliver(self, message):
+        # A connection that went stale since the last ping gets one reconnect
+        for attempt in range(2):
+            try:
+                if self._server is None:
+                    self._server = self._connect()
+                self._server.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._server = None
+            except Exception as e:
+                self._server = None
+                logger.error("Failed to send email to %s: %s", message["To"], e)
+                return
+        logger.error("Failed to send email to %s: server disconnected", message["To"])
+
+    def _run(self):
+        while True:
+            try:
+                message = self._queue.get(timeout=KEEPALIVE_INTERVAL)
+            except queue.Empty:
+                self._keepalive()
+                continue
+            self._deliver(message)
+
+smtp_worker = SMTPWorker()
@@ -2,16 +2,40 @@ import streamlit as st
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+import numpy as np
 from datetime import datetime
-import json
+import orjson
+from urllib.parse import quote, quote_plus
 from auth import check_subscription_limits, log_user_activity
-from supabase import create_client, Client
-import os
+from supabase import Client
+from database import get_supabase
+from activity_logger import search_log_buffer
 
-# Initialize Supabase client
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_ANON_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+# Shared Supabase client (created once per server process, not per rerun)
+supabase: Client = get_supabase()
+
+# Supplier search pages, filled in with the URL-encoded query
+SOURCE_TEMPLATES = (
+    ("Alibaba", "https://www.alibaba.com/trade/search?SearchText={q}"),
+    ("Global Sources", "https://www.globalsources.com/gsol/I/{path}"),
+    ("Made-in-China", "https://www.made-in-china.com/products-search/hot-china-products/{path}"),
+    ("DHgate", "https://www.dhgate.com/wholesale/search.do?searchkey={q}"),
+    ("TradeKey", "https://www.tradekey.com/ks/{path}")
+)
+SOURCE_NAMES = np.array([name for name, _ in SOURCE_TEMPLATES])
+
+# Value pools for mock results, built once as arrays that rng.choice and indexing use directly
+MOCK_LOCATIONS = np.array(["China", "USA", "Germany", "India", "South Korea"])
+MOCK_CERTIFICATIONS = np.array(["ISO 9001", "CE", "FCC", "RoHS"])
+MOCK_PAYMENT_TERMS = np.array(["T/T", "L/C", "PayPal", "Western Union"])
+
+# Result sort options: (column, ascending)
+SORT_OPTIONS = {
+    "Price (Low to High)": ("price", True),
+    "Price (High to Low)": ("price", False),
+    "Rating": ("supplier_rating", False),
+    "Min Order Qty": ("min_order_qty", True)
+}
 
 def enhanced_product_sourcing():
     """Enhanced product sourcing with web scraping"""
@@ -70,29 +94,29 @@ def enhanced_product_sourcing():
                     }
                 })
                 
-                # Store search log
-                supabase.table("search_logs").insert({
+                # Perform web scraping
+                results = scrape_product_data(search_query, search_type, {
+                    "price_range": price_range,
+                    "category": category,
+                    "region": region,
+                    "min_quantity": min_quantity,
+                    "quality_rating": quality_rating,
+                    "certifications": certification
+                })
+                
+                # Store search log with its result count (written in the background with other searches)
+                search_log_buffer.append({
                     "user_id": user["id"],
                     "search_query": search_query,
                     "search_type": search_type.lower(),
+                    "results_count": len(results),
                     "filters_applied": {
                         "price_range": price_range,
                         "category": category,
                         "region": region,
                         "quality_rating": quality_rating,
                         "certifications": certification
-                    },
-                    "created_at": datetime.now().isoformat()
-                }).execute()
-                
-                # Perform web scraping
-                results = scrape_product_data(search_query, search_type, {
-                    "price_range": price_range,
-                    "category": category,
-                    "region": region,
-                    "min_quantity": min_quantity,
-                    "quality_rating": quality_rating,
-                    "certifications": certification
+                    }
                 })
                 
                 # Display results
@@ -104,57 +128,81 @@ def enhanced_product_sourcing():
     st.subheader("📋 Recent Searches")
     show_recent_searches(user["id"])
 
+def build_source_urls(query):
+    """Supplier search URLs for a query, in SOURCE_TEMPLATES order"""
+    # The query is encoded once per form: {q} for query strings, {path} for path segments
+    encoded = {"q": quote_plus(query), "path": quote(query, safe="")}
+    return np.array([template.format(**encoded) for _, template in SOURCE_TEMPLATES])
+
 def scrape_product_data(query, search_type, filters):
-    """Scrape product data from multiple sources"""
-    results = []
+    """Scrape product data from multiple sources, returned as one row per product"""
+    # Results are mocked until per-site scraping of the sources is implemented
+    source_urls = build_source_urls(query)
     
-    # Simulate web scraping from multiple sources
-    # In production, you would scrape from actual B2B platforms
+    # Mock data generation, drawn column-wise in one shot
+    n = 20
+    rng = np.random.default_rng()
+    price_low, price_high = filters["price_range"]
+    min_quantity = filters["min_quantity"]
     
-    sources = [
-        {"name": "Alibaba", "url": f"https://www.alibaba.com/trade/search?SearchText={query}"},
-        {"name": "Global Sources", "url": f"https://www.globalsources.com/gsol/I/{query}"},
-        {"name": "Made-in-China", "url": f"https://www.made-in-china.com/products-search/hot-china-products/{query}"},
-        {"name": "DHgate", "url": f"https://www.dhgate.com/wholesale/search.do?searchkey={query}"},
-        {"name": "TradeKey", "url": f"https://www.tradekey.com/ks/{query}"}
-    ]
+    prices = rng.uniform(price_low, price_high, n).round(2)
+    min_order_qtys = rng.integers(min_quantity, min_quantity * 10, n, endpoint=True)
+    ratings = rng.uniform(filters["quality_rating"], 5, n).round(1)
+    locations = rng.choice(MOCK_LOCATIONS, n)
+    lead_times = rng.integers(7, 30, n, endpoint=True)
+    payment_terms = rng.choice(MOCK_PAYMENT_TERMS, n)
+    source_idx = rng.integers(0, SOURCE_NAMES.size, n)
     
-    # Mock data generation (replace with actual scraping)
-    import random
+    # Each product gets 1-3 distinct certifications: a random permutation per row, truncated
+    cert_order = rng.random((n, MOCK_CERTIFICATIONS.size)).argsort(axis=1)
+    cert_counts = rng.integers(1, 3, n, endpoint=True)
     
-    for i in range(20):  # Generate 20 mock results
-        source = random.choice(sources)
-        
-        # Generate realistic product data
-        product = {
-            "id": f"prod_{i+1}",
-            "name": f"{query.title()} - Model {chr(65+i)}",
-            "description": f"High-quality {query} suitable for {search_type.lower()} use. Professional grade with excellent durability.",
-            "price": round(random.uniform(filters["price_range"][0], filters["price_range"][1]), 2),
-            "min_order_qty": random.randint(filters["min_quantity"], filters["min_quantity"] * 10),
-            "supplier": f"Supplier {i+1}",
-            "supplier_rating": round(random.uniform(filters["quality_rating"], 5), 1),
-            "location": random.choice(["China", "USA", "Germany", "India", "South Korea"]),
-            "certifications": random.sample(["ISO 9001", "CE", "FCC", "RoHS"], random.randint(1, 3)),
-            "lead_time": f"{random.randint(7, 30)} days",
-            "payment_terms": random.choice(["T/T", "L/C", "PayPal", "Western Union"]),
-            "source": source["name"],
-            "source_url": source["url"],
-            "image_url": f"https://via.placeholder.com/200x200?text={query.replace(' ', '+')}"
-        }
-        
-        # Apply filters
-        if (filters["price_range"][0] <= product["price"] <= filters["price_range"][1] and
-            product["supplier_rating"] >= filters["quality_rating"]):
-            
-            if filters["category"] == "All" or filters["category"].lower() in product["description"].lower():
-                results.append(product)
+    description = f"High-quality {query} suitable for {search_type.lower()} use. Professional grade with excellent durability."
+    name_prefix = query.title()
+    results = pd.DataFrame({
+        "id": [f"prod_{i+1}" for i in range(n)],
+        "name": [f"{name_prefix} - Model {chr(65+i)}" for i in range(n)],
+        "description": description,
+        "price": prices,
+        "min_order_qty": min_order_qtys,
+        "supplier": [f"Supplier {i+1}" for i in range(n)],
+        "supplier_rating": ratings,
+        "location": locations,
+        "certifications": [MOCK_CERTIFICATIONS[cert_order[i, :cert_counts[i]]].tolist() for i in range(n)],
+        "lead_time": [f"{days} days" for days in lead_times.tolist()],
+        "payment_terms": payment_terms,
+        "source": SOURCE_NAMES[source_idx],
+        "source_url": source_urls[source_idx],
+        "image_url": f"https://via.placeholder.com/200x200?text={query.replace(' ', '+')}"
+    })
+    
+    return _finish_results(results, filters)
+
+def _finish_results(results, filters):
+    """Apply the search filters and add display-only columns"""
+    results = filter_products(results, filters)
+    
+    # Grid card titles are truncated once for the whole column, not per rendered card
+    names = results["name"]
+    results["display_name"] = names.where(names.str.len() <= 30, names.str.slice(0, 30) + "...")
     
     return results
 
+def filter_products(products, filters):
+    """Keep the products matching the price, rating and category filters"""
+    # One combined mask over the raw column arrays, so the frame is indexed once
+    prices = products["price"].to_numpy()
+    price_low, price_high = filters["price_range"]
+    mask = (prices >= price_low) & (prices <= price_high) & (products["supplier_rating"].to_numpy() >= filters["quality_rating"])
+    if filters["category"] != "All":
+        # Literal, case-insensitive match: no per-row lower() and no regex interpretation
+        mask &= products["description"].str.contains(filters["category"], case=False, regex=False, na=False).to_numpy()
+    
+    return products[mask].reset_index(drop=True)
+
 def display_search_results(results, query):
     """Display search results in an organized manner"""
-    if not results:
+    if results.empty:
         st.warning("No products found matching your criteria. Try adjusting your filters.")
         return
     
@@ -163,25 +211,19 @@ def display_search_results(results, query):
     # Sort options
     col1, col2 = st.columns(2)
     with col1:
-        sort_by = st.selectbox("Sort by", ["Price (Low to High)", "Price (High to Low)", "Rating", "Min Order Qty"])
+        sort_by = st.selectbox("Sort by", list(SORT_OPTIONS))
     with col2:
         view_mode = st.radio("View Mode", ["Grid", "List"], horizontal=True)
     
     # Sort results
-    if sort_by == "Price (Low to High)":
-        results.sort(key=lambda x: x["price"])
-    elif sort_by == "Price (High to Low)":
-        results.sort(key=lambda x: x["price"], reverse=True)
-    elif sort_by == "Rating":
-        results.sort(key=lambda x: x["supplier_rating"], reverse=True)
-    elif sort_by == "Min Order Qty":
-        results.sort(key=lambda x: x["min_order_qty"])
+    sort_column, ascending = SORT_OPTIONS[sort_by]
+    products = results.sort_values(sort_column, ascending=ascending, kind="stable").to_dict("records")
     
     # Display results
     if view_mode == "Grid":
-        display_grid_view(results)
+        display_grid_view(products)
     else:
-        display_list_view(results)
+        display_list_view(products)
 
 def display_grid_view(results):
     """Display results in grid view"""
@@ -197,7 +239,7 @@ def display_grid_view(results):
                 with col:
                     with st.container():
                         st.image(product["image_url"], use_column_width=True)
-                        st.subheader(product["name"][:30] + "..." if len(product["name"]) > 30 else product["name"])
+                        st.subheader(product["display_name"])
                         st.write(f"💰 **${product['price']:.2f}**")
                         st.write(f"📦 Min Order: {product['min_order_qty']}")
                         st.write(f"⭐ Rating: {product['supplier_rating']}/5")
@@ -303,24 +345,33 @@ def contact_supplier(product):
     # In production, this would integrate with messaging system
     st.success("Contact request sent to supplier!")
 
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_recent_searches(user_id, limit=10):
+    """Fetch the user's latest search logs with result counts (errors raise, so they aren't cached)"""
+    return supabase.rpc("recent_searches_with_counts", {"uid": user_id, "max_rows": limit}).execute().data
+
+# Searches show up in the history as soon as their log rows are written
+search_log_buffer.on_flush(fetch_recent_searches.clear)
+
 def show_recent_searches(user_id):
     """Show user's recent searches"""
     try:
-        searches = supabase.table("search_logs").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(10).execute()
+        searches = fetch_recent_searches(user_id)
         
-        if searches.data:
-            for search in searches.data:
+        if searches:
+            for search in searches:
                 with st.expander(f"🔍 {search['search_query']} - {search['created_at'][:10]}"):
                     st.write(f"**Type:** {search['search_type'].title()}")
                     st.write(f"**Results:** {search.get('results_count', 0)} products found")
                     if search.get('filters_applied'):
-                        st.write(f"**Filters:** {json.dumps(search['filters_applied'], indent=2)}")
+                        st.write("**Filters:**")
+                        st.code(orjson.dumps(search['filters_applied'], option=orjson.OPT_INDENT_2).decode(), language="json")
                     
                     if st.button(f"Search Again", key=f"repeat_{search['id']}"):
                         st.session_state.repeat_search = search['search_query']
-                        st.experimental_rerun()
+                        st.rerun()
         else:
             st.info("No recent searches found. Start searching to see your history here!")
     
     except Exception as e:
-        st.error(f"Error loading search history: {str(e)}")
\ No newline at end of file
+        st.error(f"Error loading search history: {str(e)}")
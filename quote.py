@@ -2,23 +2,30 @@ from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 import datetime
 
+PAGE_WIDTH, PAGE_HEIGHT = letter
+
 def generate_quote_pdf(product_name: str, quantity: int):
     """
     Generates a PDF quote with basic product and quantity information.
     Saves the PDF as 'quote.pdf' in the local directory.
     """
     filename = "quote.pdf"
-    c = canvas.Canvas(filename, pagesize=letter)
-    width, height = letter
+    c = canvas.Canvas(filename, pagesize=letter, pageCompression=1)
 
     c.setFont("Helvetica-Bold", 20)
-    c.drawString(50, height - 50, "Quotation")
+    c.drawString(50, PAGE_HEIGHT - 50, "Quotation")
 
-    c.setFont("Helvetica", 12)
-    c.drawString(50, height - 100, f"Date: {datetime.datetime.now().strftime('%Y-%m-%d')}")
-    c.drawString(50, height - 120, f"Product: {product_name}")
-    c.drawString(50, height - 140, f"Quantity: {quantity}")
-    c.drawString(50, height - 180, "Thank you for your business.")
+    # Body lines go out as one text object, 20pt apart
+    body = c.beginText(50, PAGE_HEIGHT - 100)
+    body.setFont("Helvetica", 12, leading=20)
+    body.textLines([
+        f"Date: {datetime.datetime.now().strftime('%Y-%m-%d')}",
+        f"Product: {product_name}",
+        f"Quantity: {quantity}",
+        "",
+        "Thank you for your business."
+    ])
+    c.drawText(body)
 
     c.save()
     return filename
@@ -0,0 +1,68 @@
+import os
+import time
+import threading
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+class TokenBucket:
+    """
+    Thread-safe client-side limiter for a requests-per-minute budget and an
+    optional tokens-per-minute budget. Callers block in acquire() until their
+    request fits, which keeps bursts just under the provider's rate limits
+    instead of tripping 429s and retrying serially.
+    """
+    
+    def __init__(self, max_requests_per_minute: int, max_tokens_per_minute: int = 0):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self._available_requests = float(max_requests_per_minute)
+        self._available_tokens = float(max_tokens_per_minute)
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self._available_requests = min(
+            self.max_requests_per_minute,
+            self._available_requests + elapsed * self.max_requests_per_minute / 60
+        )
+        if self.max_tokens_per_minute:
+            self._available_tokens = min(
+                self.max_tokens_per_minute,
+                self._available_tokens + elapsed * self.max_tokens_per_minute / 60
+            )
+    
+    def acquire(self, tokens: int = 0):
+        """Block until one request (consuming the given token estimate) fits the budget"""
+        tokens = min(tokens, self.max_tokens_per_minute) if self.max_tokens_per_minute else 0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._available_requests >= 1 and self._available_tokens >= tokens:
+                    self._available_requests -= 1
+                    self._available_tokens -= tokens
+                    return
+                wait = (1 - self._available_requests) * 60 / self.max_requests_per_minute
+                if tokens:
+                    wait = max(wait, (tokens - self._available_tokens) * 60 / self.max_tokens_per_minute)
+            time.sleep(max(wait, 0.01))
+
+def is_rate_limit_error(error) -> bool:
+    """Whether an API client error is an HTTP 429 (OpenAI uses status_code, Replicate uses status)"""
+    return getattr(error, "status_code", None) == 429 or getattr(error, "status", None) == 429
+
+# Retry the occasional 429 that still gets through, with jittered exponential backoff
+retry_on_rate_limit = retry(
+    retry=retry_if_exception(is_rate_limit_error),
+    wait=wait_exponential_jitter(initial=1, max=20),
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+
+# Shared limiters, sized from the environment
+openai_limiter = TokenBucket(
+    int(os.environ.get("OPENAI_MAX_REQUESTS_PER_MINUTE", "500")),
+    int(os.environ.get("OPENAI_MAX_TOKENS_PER_MINUTE", "200000"))
+)
+replicate_limiter = TokenBucket(int(os.environ.get("REPLICATE_MAX_REQUESTS_PER_MINUTE", "60")))
@@ -0,0 +1,88 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from supabase import acreate_client
+
+logger = logging.getLogger(__name__)
+
+# Reconnect backoff after the subscription fails or drops, and how often the socket is checked
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+CONNECTION_CHECK_INTERVAL = 5
+
+class RealtimeFeed:
+    """
+    Keeps the latest rows inserted into a table, pushed over a Supabase Realtime
+    channel by a background thread, so dashboards can render recent events
+    without polling the database on every rerun. The thread reconnects with
+    backoff; `alive` is False while it has no working subscription.
+    """
+
+    def __init__(self, table: str, maxlen: int = 10):
+        self.table = table
+        self.seeded = False
+        self.alive = False
+        self._rows = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def seed(self, rows):
+        """Fill the feed from a REST query (newest first), skipping rows already pushed"""
+        with self._lock:
+            if self.seeded:
+                return
+            # Pushed rows are newer than the query result, so they stay in front; the
+            # merge is trimmed first because an overflowing deque drops from the front
+            pushed = list(self._rows)
+            seen = {row.get("id") for row in pushed}
+            merged = pushed + [row for row in rows if row.get("id") not in seen]
+            self._rows.clear()
+            self._rows.extend(merged[:self._rows.maxlen])
+            self.seeded = True
+
+    def snapshot(self) -> list:
+        """Latest rows, newest first"""
+        with self._lock:
+            return list(self._rows)
+
+    def _on_insert(self, payload):
+        # realtime-py 2.x nests the change under "data"; older versions don't
+        record = payload.get("data", payload).get("record")
+        if record:
+            with self._lock:
+                self._rows.appendleft(record)
+
+    def _run(self):
+        delay = RECONNECT_MIN_DELAY
+        while True:
+            try:
+                asyncio.run(self._listen())
+            except Exception as e:
+                logger.warning("Realtime feed for %s disconnected: %s", self.table, e)
+            # A subscription that came up resets the backoff
+            if self.alive:
+                delay = RECONNECT_MIN_DELAY
+            self.alive = False
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _listen(self):
+        client = await acreate_client(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_ANON_KEY"))
+        channel = client.channel(f"{self.table}-feed")
+        channel.on_postgres_changes("INSERT", schema="public", table=self.table, callback=self._on_insert)
+
+        # Rows from before this subscription may have been missed, so the feed is reseeded
+        with self._lock:
+            self._rows.clear()
+            self.seeded = False
+        await channel.subscribe()
+        self.alive = True
+
+        # The realtime client delivers messages from its own task; watch the socket meanwhile
+        while getattr(client.realtime, "is_connected", True):
+            await asyncio.sleep(CONNECTION_CHECK_INTERVAL)
+        raise ConnectionError("realtime socket closed")
@@ -5,17 +5,19 @@ Run this after setting up the database to create test accounts
 
 import os
 from supabase import create_client, Client
-import hashlib
-from datetime import datetime
+from argon2 import PasswordHasher
 
 # Initialize Supabase client
 supabase_url = os.environ.get("SUPABASE_URL")
 supabase_key = os.environ.get("SUPABASE_ANON_KEY")
 supabase: Client = create_client(supabase_url, supabase_key)
 
+# Same Argon2id parameters as auth.py, so seeded accounts verify without a rehash
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password using Argon2id"""
+    return _password_hasher.hash(password)
 
 def create_test_users():
     """Create test users for the platform"""
@@ -74,35 +76,36 @@ def create_test_users():
     
     print("Creating test users...")
     
-    for user_data in test_users:
-        try:
-            # Check if user already exists
-            existing = supabase.table("users").select("*").eq("username", user_data["username"]).execute()
-            
-            if existing.data:
-                print(f"User {user_data['username']} already exists, skipping...")
-                continue
-            
-            # Create user
-            user_record = {
+    try:
+        user_records = [
+            {
                 "username": user_data["username"],
                 "email": user_data["email"],
                 "password_hash": hash_password(user_data["password"]),
                 "is_admin": user_data["is_admin"],
                 "subscription_tier": user_data["subscription_tier"],
                 "subscription_status": "active",
-                "created_at": datetime.now().isoformat(),
                 "profile_data": {
                     "demo_account": True,
                     "industry": "Demo" if "demo" in user_data["username"] else "General"
                 }
             }
-            
-            result = supabase.table("users").insert(user_record).execute()
-            print(f"✅ Created user: {user_data['username']} ({user_data['subscription_tier']})")
-            
-        except Exception as e:
-            print(f"❌ Error creating user {user_data['username']}: {str(e)}")
+            for user_data in test_users
+        ]
+        
+        # Insert every missing user in one request; existing usernames are left untouched
+        # and only the newly created rows come back
+        created = supabase.table("users").upsert(user_records, on_conflict="username", ignore_duplicates=True).execute()
+        created_usernames = {row["username"] for row in created.data}
+        
+        for user_record in user_records:
+            if user_record["username"] in created_usernames:
+                print(f"✅ Created user: {user_record['username']} ({user_record['subscription_tier']})")
+            else:
+                print(f"User {user_record['username']} already exists, skipping...")
+        
+    except Exception as e:
+        print(f"❌ Error creating test users: {str(e)}")
     
     print("\n🎉 Test user setup complete!")
     print("\n📋 Test Account Credentials:")
@@ -122,15 +125,13 @@ def create_sample_data():
             "user_id": "testuser1",  # This would need to be actual UUID in production
             "feedback_text": "Great platform! Love the AI suggestions.",
             "rating": 5,
-            "category": "general",
-            "created_at": datetime.now().isoformat()
+            "category": "general"
         },
         {
             "user_id": "testuser2",
             "feedback_text": "The product sourcing feature is very helpful.",
             "rating": 4,
-            "category": "feature",
-            "created_at": datetime.now().isoformat()
+            "category": "feature"
         }
     ]
     
@@ -0,0 +1,35 @@
+/*
+  # Admin overview metrics
+
+  1. Functions
+    - `admin_overview_metrics()` - returns the four overview counters and the
+      current monthly revenue in a single row so the admin dashboard no longer
+      downloads entire tables just to count them
+*/
+
+CREATE OR REPLACE FUNCTION admin_overview_metrics()
+RETURNS TABLE (
+  total_users int,
+  active_30d int,
+  today_activities int,
+  new_today int,
+  monthly_revenue numeric
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    count(*)::int,
+    count(*) FILTER (WHERE last_login >= now() - interval '30 days')::int,
+    (SELECT count(*) FROM user_activity WHERE created_at >= date_trunc('day', now()))::int,
+    count(*) FILTER (WHERE created_at >= date_trunc('day', now()))::int,
+    COALESCE(SUM(
+      CASE subscription_tier
+        WHEN 'basic' THEN 29.99
+        WHEN 'premium' THEN 99.99
+        WHEN 'enterprise' THEN 299.99
+        ELSE 0
+      END
+    ) FILTER (WHERE subscription_status = 'active'), 0)
+  FROM users;
+$$;
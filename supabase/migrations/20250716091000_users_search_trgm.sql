@@ -0,0 +1,15 @@
+/*
+  # Trigram indexes for user search
+
+  1. Extensions
+    - `pg_trgm` for substring (ILIKE '%term%') index support
+
+  2. Indexes
+    - GIN trigram indexes on `users.username` and `users.email` so the admin
+      user search can filter server-side without a sequential scan
+*/
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_users_username_trgm ON users USING gin (username gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);
@@ -0,0 +1,50 @@
+/*
+  # Monthly revenue aggregation
+
+  1. Functions
+    - `monthly_revenue()` - sums subscription prices of active users in SQL
+      (GROUP BY tier) instead of shipping every active user to the client
+    - `admin_overview_metrics()` - recreated to reuse `monthly_revenue()` so
+      the tier pricing lives in one place
+*/
+
+CREATE OR REPLACE FUNCTION monthly_revenue()
+RETURNS numeric
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT COALESCE(SUM(
+    tier_count * CASE subscription_tier
+      WHEN 'basic' THEN 29.99
+      WHEN 'premium' THEN 99.99
+      WHEN 'enterprise' THEN 299.99
+      ELSE 0
+    END
+  ), 0)
+  FROM (
+    SELECT subscription_tier, count(*) AS tier_count
+    FROM users
+    WHERE subscription_status = 'active'
+    GROUP BY subscription_tier
+  ) tiers;
+$$;
+
+CREATE OR REPLACE FUNCTION admin_overview_metrics()
+RETURNS TABLE (
+  total_users int,
+  active_30d int,
+  today_activities int,
+  new_today int,
+  monthly_revenue numeric
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    count(*)::int,
+    count(*) FILTER (WHERE last_login >= now() - interval '30 days')::int,
+    (SELECT count(*) FROM user_activity WHERE created_at >= date_trunc('day', now()))::int,
+    count(*) FILTER (WHERE created_at >= date_trunc('day', now()))::int,
+    monthly_revenue()
+  FROM users;
+$$;
@@ -0,0 +1,46 @@
+/*
+  # Precomputed daily aggregates
+
+  1. Materialized Views
+    - `daily_activity` - activity counts per day, action type and user
+    - `daily_registrations` - new user registrations per day
+
+  2. Refresh
+    - Both views are refreshed concurrently every 10 minutes via `pg_cron`, so
+      dashboard charts read a handful of aggregated rows instead of grouping
+      raw `user_activity` / `users` rows on every render
+*/
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS daily_activity AS
+  SELECT
+    date_trunc('day', created_at)::date AS d,
+    action_type,
+    user_id,
+    count(*)::int AS c
+  FROM user_activity
+  GROUP BY 1, 2, 3;
+
+-- A unique index is required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_activity_key
+  ON daily_activity (d, action_type, user_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS daily_registrations AS
+  SELECT
+    date_trunc('day', created_at)::date AS d,
+    count(*)::int AS registrations
+  FROM users
+  GROUP BY 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_registrations_key
+  ON daily_registrations (d);
+
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
+SELECT cron.schedule(
+  'refresh-daily-aggregates',
+  '*/10 * * * *',
+  $$
+    REFRESH MATERIALIZED VIEW CONCURRENTLY daily_activity;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY daily_registrations;
+  $$
+);
@@ -0,0 +1,21 @@
+/*
+  # Indexes for dashboard filter predicates
+
+  1. Indexes
+    - `users(last_login DESC)` - active-user (30d) counts
+    - `users(created_at)` - new-user counts and registration trends
+    - `users(subscription_status, subscription_tier)` - revenue and tier filters
+    - `user_activity(user_id, created_at DESC)` - per-user activity feeds and
+      daily usage checks (`user_activity(created_at)` already exists)
+    - `orders(created_at)` - revenue reports and buying behavior windows
+    - `feedback(created_at DESC)` - moderation feed ordering
+
+  Check plans with EXPLAIN ANALYZE before and after applying.
+*/
+
+CREATE INDEX IF NOT EXISTS idx_users_last_login ON users(last_login DESC);
+CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
+CREATE INDEX IF NOT EXISTS idx_users_status_tier ON users(subscription_status, subscription_tier);
+CREATE INDEX IF NOT EXISTS idx_user_activity_user_created ON user_activity(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at);
+CREATE INDEX IF NOT EXISTS idx_feedback_created_at ON feedback(created_at DESC);
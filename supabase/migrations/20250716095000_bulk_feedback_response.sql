@@ -0,0 +1,19 @@
+/*
+  # Bulk feedback responses
+
+  1. Functions
+    - `bulk_feedback_response(ids, responses)` - stores several admin responses
+      in one UPDATE ... FROM unnest(...) instead of one request per feedback item
+*/
+
+CREATE OR REPLACE FUNCTION bulk_feedback_response(ids uuid[], responses text[])
+RETURNS void
+LANGUAGE sql
+AS $$
+  UPDATE feedback f
+  SET admin_response = r.response,
+      status = 'in_progress',
+      updated_at = now()
+  FROM unnest(ids, responses) AS r(id, response)
+  WHERE f.id = r.id;
+$$;
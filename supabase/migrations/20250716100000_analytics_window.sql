@@ -0,0 +1,52 @@
+/*
+  # Windowed analytics aggregation
+
+  1. Functions
+    - `analytics_window(start_at, end_at)` - returns activity counts by type,
+      by day and the ten most active users for a time window as one JSON
+      object, so the analytics dashboard downloads aggregates instead of raw
+      `user_activity` rows
+*/
+
+CREATE OR REPLACE FUNCTION analytics_window(start_at timestamptz, end_at timestamptz)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+  WITH window_activity AS (
+    SELECT user_id, action_type, created_at
+    FROM user_activity
+    WHERE created_at >= start_at AND created_at < end_at
+  )
+  SELECT json_build_object(
+    'by_type', COALESCE((
+      SELECT json_agg(x)
+      FROM (
+        SELECT action_type, count(*) AS count
+        FROM window_activity
+        GROUP BY 1
+        ORDER BY 2 DESC
+      ) x
+    ), '[]'::json),
+    'by_day', COALESCE((
+      SELECT json_agg(x)
+      FROM (
+        SELECT date_trunc('day', created_at)::date AS date, count(*) AS count
+        FROM window_activity
+        GROUP BY 1
+        ORDER BY 1
+      ) x
+    ), '[]'::json),
+    'top_users', COALESCE((
+      SELECT json_agg(x)
+      FROM (
+        SELECT wa.user_id, u.username, u.email, u.subscription_tier, count(*) AS count
+        FROM window_activity wa
+        JOIN users u ON u.id = wa.user_id
+        GROUP BY 1, 2, 3, 4
+        ORDER BY 5 DESC
+        LIMIT 10
+      ) x
+    ), '[]'::json)
+  );
+$$;
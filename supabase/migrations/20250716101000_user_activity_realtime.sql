@@ -0,0 +1,9 @@
+/*
+  # Realtime activity feed
+
+  1. Publications
+    - Add `user_activity` to `supabase_realtime` so the admin overview can
+      subscribe to new activity inserts instead of polling the table
+*/
+
+ALTER PUBLICATION supabase_realtime ADD TABLE user_activity;
@@ -0,0 +1,27 @@
+/*
+  # Lightweight recent suggestions lookup
+
+  1. Indexes
+    - `product_suggestions(user_id, created_at DESC)` - serves the per-user
+      "most recent first" scan without a sort
+
+  2. Functions
+    - `recent_suggestions_lite(uid, max_rows)` - returns only the id, product
+      name and creation date of a user's latest suggestions, so the recent
+      suggestions list never transfers the `suggestion_data` JSONB blobs
+*/
+
+CREATE INDEX IF NOT EXISTS idx_product_suggestions_user_created
+  ON product_suggestions(user_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION recent_suggestions_lite(uid uuid, max_rows integer DEFAULT 10)
+RETURNS TABLE(id uuid, name text, d date)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT id, suggestion_data->>'name', created_at::date
+  FROM product_suggestions
+  WHERE user_id = uid
+  ORDER BY created_at DESC
+  LIMIT max_rows
+$$;
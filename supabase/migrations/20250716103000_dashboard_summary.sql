@@ -0,0 +1,36 @@
+/*
+  # User dashboard summary
+
+  1. Functions
+    - `dashboard_summary(uid)` - returns today's search and AI suggestion
+      counts, the user's total orders, their latest activity and their 20 most
+      recent activities as one JSON object, so the user dashboard loads with a
+      single round-trip instead of one request per metric
+*/
+
+CREATE OR REPLACE FUNCTION dashboard_summary(uid uuid)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  WITH today AS (
+    SELECT action_type, count(*) AS c
+    FROM user_activity
+    WHERE user_id = uid AND created_at >= current_date
+    GROUP BY 1
+  ),
+  recent AS (
+    SELECT id, action_type, details, created_at
+    FROM user_activity
+    WHERE user_id = uid
+    ORDER BY created_at DESC
+    LIMIT 20
+  )
+  SELECT jsonb_build_object(
+    'searches_today', COALESCE((SELECT c FROM today WHERE action_type = 'search'), 0),
+    'suggestions_today', COALESCE((SELECT c FROM today WHERE action_type = 'ai_suggestion'), 0),
+    'orders_total', (SELECT count(*) FROM orders WHERE user_id = uid),
+    'last_activity', (SELECT to_jsonb(r) FROM recent r ORDER BY created_at DESC LIMIT 1),
+    'recent_activities', COALESCE((SELECT jsonb_agg(to_jsonb(r) ORDER BY r.created_at DESC) FROM recent r), '[]'::jsonb)
+  )
+$$;
@@ -0,0 +1,14 @@
+/*
+  # Per-action activity index
+
+  1. Indexes
+    - `user_activity(user_id, action_type, created_at DESC)` - daily usage
+      counts and subscription limit checks filter on all three columns, so
+      they can be answered from the index alone
+
+  `orders(user_id)` and `user_activity(user_id, created_at DESC)` already
+  exist for order counts and recent-activity lookups.
+*/
+
+CREATE INDEX IF NOT EXISTS idx_user_activity_user_action_created
+  ON user_activity(user_id, action_type, created_at DESC);
@@ -0,0 +1,34 @@
+/*
+  # Slimmer dashboard summary
+
+  1. Functions
+    - `dashboard_summary(uid)` - now returns only the 10 activities the
+      dashboard lists, with just the columns it renders, and drops the unused
+      `last_activity` entry
+*/
+
+CREATE OR REPLACE FUNCTION dashboard_summary(uid uuid)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  WITH today AS (
+    SELECT action_type, count(*) AS c
+    FROM user_activity
+    WHERE user_id = uid AND created_at >= current_date
+    GROUP BY 1
+  ),
+  recent AS (
+    SELECT action_type, details, created_at
+    FROM user_activity
+    WHERE user_id = uid
+    ORDER BY created_at DESC
+    LIMIT 10
+  )
+  SELECT jsonb_build_object(
+    'searches_today', COALESCE((SELECT c FROM today WHERE action_type = 'search'), 0),
+    'suggestions_today', COALESCE((SELECT c FROM today WHERE action_type = 'ai_suggestion'), 0),
+    'orders_total', (SELECT count(*) FROM orders WHERE user_id = uid),
+    'recent_activities', COALESCE((SELECT jsonb_agg(to_jsonb(r) ORDER BY r.created_at DESC) FROM recent r), '[]'::jsonb)
+  )
+$$;
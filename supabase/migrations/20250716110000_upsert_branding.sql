@@ -0,0 +1,30 @@
+/*
+  # Atomic branding save
+
+  1. Functions
+    - `upsert_branding(p_user_id, p_payload)` - deactivates the user's current
+      branding and inserts the new configuration in one transaction, so a save
+      is a single request and there is never a moment with no active branding
+*/
+
+CREATE OR REPLACE FUNCTION upsert_branding(p_user_id uuid, p_payload jsonb)
+RETURNS void
+LANGUAGE sql
+AS $$
+  UPDATE custom_branding
+  SET is_active = false,
+      updated_at = now()
+  WHERE user_id = p_user_id AND is_active;
+
+  INSERT INTO custom_branding (user_id, brand_name, logo_url, primary_color, secondary_color, font_family, brand_guidelines, is_active)
+  VALUES (
+    p_user_id,
+    p_payload->>'brand_name',
+    p_payload->>'logo_url',
+    COALESCE(p_payload->>'primary_color', '#000000'),
+    COALESCE(p_payload->>'secondary_color', '#ffffff'),
+    COALESCE(p_payload->>'font_family', 'Arial'),
+    COALESCE(p_payload->'brand_guidelines', '{}'::jsonb),
+    true
+  );
+$$;
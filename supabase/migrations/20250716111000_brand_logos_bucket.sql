@@ -0,0 +1,19 @@
+/*
+  # Brand logo storage
+
+  1. Storage
+    - `brand-logos` - public bucket for uploaded brand logos, stored as
+      `<user_id>/logo.<ext>` and uploaded as raw bytes from the branding page
+*/
+
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('brand-logos', 'brand-logos', true)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE POLICY "System can upload brand logos" ON storage.objects
+  FOR INSERT
+  WITH CHECK (bucket_id = 'brand-logos');
+
+CREATE POLICY "System can replace brand logos" ON storage.objects
+  FOR UPDATE
+  USING (bucket_id = 'brand-logos');
@@ -0,0 +1,27 @@
+/*
+  # Recent searches with result counts
+
+  1. Indexes
+    - `search_logs(user_id, created_at DESC)` - serves the per-user
+      "most recent first" scan without a sort
+
+  2. Functions
+    - `recent_searches_with_counts(uid, max_rows)` - returns a user's latest
+      searches with the columns the history list shows, including the stored
+      `results_count`, in one round trip
+*/
+
+CREATE INDEX IF NOT EXISTS idx_search_logs_user_created
+  ON search_logs(user_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION recent_searches_with_counts(uid uuid, max_rows integer DEFAULT 10)
+RETURNS TABLE(id uuid, search_query text, search_type text, results_count integer, filters_applied jsonb, created_at timestamptz)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT id, search_query, search_type, COALESCE(results_count, 0), filters_applied, created_at
+  FROM search_logs
+  WHERE user_id = uid
+  ORDER BY created_at DESC
+  LIMIT max_rows
+$$;
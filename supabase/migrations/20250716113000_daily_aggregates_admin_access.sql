@@ -0,0 +1,44 @@
+/*
+  # Admin-only access to the daily aggregates
+
+  1. Security
+    - Materialized views bypass RLS, so `daily_activity` and `daily_registrations`
+      are no longer readable by `anon` / `authenticated` directly
+
+  2. Functions
+    - `admin_daily_activity(since, until)` - per-day activity rows for the admin
+      charts and usage report, returned only when the caller is an admin
+    - `admin_daily_registrations(max_rows)` - latest registrations per day,
+      newest first, returned only when the caller is an admin
+*/
+
+REVOKE SELECT ON daily_activity FROM anon, authenticated;
+REVOKE SELECT ON daily_registrations FROM anon, authenticated;
+
+CREATE OR REPLACE FUNCTION admin_daily_activity(since date, until date DEFAULT NULL)
+RETURNS TABLE(date date, action_type text, user_id uuid, c int)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT da.d, da.action_type, da.user_id, da.c
+  FROM daily_activity da
+  WHERE da.d >= since
+    AND (until IS NULL OR da.d <= until)
+    AND EXISTS (SELECT 1 FROM users WHERE id = auth.uid() AND is_admin = true)
+$$;
+
+CREATE OR REPLACE FUNCTION admin_daily_registrations(max_rows integer DEFAULT 30)
+RETURNS TABLE(date date, registrations int)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT dr.d, dr.registrations
+  FROM daily_registrations dr
+  WHERE EXISTS (SELECT 1 FROM users WHERE id = auth.uid() AND is_admin = true)
+  ORDER BY dr.d DESC
+  LIMIT max_rows
+$$;
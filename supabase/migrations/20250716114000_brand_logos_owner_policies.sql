@@ -0,0 +1,28 @@
+/*
+  # Scope brand logo writes to the owner's folder
+
+  1. Security
+    - Replace the brand logo upload and replace policies, which allowed writes
+      to any object in the bucket, with ones limited to `<auth.uid()>/...`
+*/
+
+DROP POLICY IF EXISTS "System can upload brand logos" ON storage.objects;
+DROP POLICY IF EXISTS "System can replace brand logos" ON storage.objects;
+
+CREATE POLICY "Users can upload their own brand logo" ON storage.objects
+  FOR INSERT
+  WITH CHECK (
+    bucket_id = 'brand-logos'
+    AND (storage.foldername(name))[1] = auth.uid()::text
+  );
+
+CREATE POLICY "Users can replace their own brand logo" ON storage.objects
+  FOR UPDATE
+  USING (
+    bucket_id = 'brand-logos'
+    AND (storage.foldername(name))[1] = auth.uid()::text
+  )
+  WITH CHECK (
+    bucket_id = 'brand-logos'
+    AND (storage.foldername(name))[1] = auth.uid()::text
+  );